@@ -1,17 +1,29 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
-import re
+from typing import Dict, List, Optional
+from contextlib import nullcontext
+import json
+import logging
+import random
+import threading
 
 # Import processing helpers from the existing Streamlit page
 from pages.humanize_text import (
-    extract_citations,
-    restore_citations,
-    minimal_rewriting,
+    HUMANIZE_STAGES,
+    humanize_document,
+    humanize_stream,
+    humanize_cache_stats,
     preserve_linebreaks_rewrite,
-    count_words,
-    count_sentences,
+    resolve_stages,
+    nlp,
 )
+from utils.document_stats import comparison_mode, document_stats
+from utils.stage_timings import StageTimings, measure
+from utils.inference_governor import inference_stats
+from utils.warmup import PRELOAD_MODELS, WARMUP_SENTENCES, preload_models
+
+logger = logging.getLogger(__name__)
 
 
 DESCRIPTION = (
@@ -45,6 +57,13 @@ class HumanizeRequest(BaseModel):
     p_syn: Optional[float] = Field(0.2, ge=0.0, le=1.0, description="Synonym replacement intensity (0.0-1.0)")
     p_trans: Optional[float] = Field(0.2, ge=0.0, le=1.0, description="Academic transition insertion probability (0.0-1.0)")
     preserve_linebreaks: Optional[bool] = Field(True, description="Whether to preserve original line breaks")
+    seed: Optional[int] = Field(None, description="RNG seed; the same text, settings and seed always give the same output (and are served from cache)")
+    stages: Optional[List[str]] = Field(
+        None,
+        description=f"Pipeline stages to run, in order (default: all of {', '.join(HUMANIZE_STAGES)}). "
+                    "Leave a stage out to skip it; synonyms and transitions may be swapped",
+    )
+    timings: Optional[bool] = Field(False, description="Return wall time and memory allocations per pipeline stage")
 
     class Config:
         schema_extra = {
@@ -53,6 +72,9 @@ class HumanizeRequest(BaseModel):
                 "p_syn": 0.3,
                 "p_trans": 0.2,
                 "preserve_linebreaks": True,
+                "seed": 42,
+                "stages": ["citations", "contractions", "synonyms", "transitions", "normalize"],
+                "timings": False,
             }
         }
 
@@ -65,6 +87,12 @@ class HumanizeResponse(BaseModel):
     new_sentence_count: int
     words_added: int
     sentences_added: int
+    seed: int = Field(..., description="Seed used for this result; send it back to reproduce the output")
+    cached: bool = Field(False, description="Whether the result was served from the result cache")
+    timings: Optional[Dict[str, Dict[str, float]]] = Field(
+        None,
+        description="Per stage: calls, ms and (while tracing) allocated_bytes and peak_bytes; only when requested",
+    )
 
     class Config:
         schema_extra = {
@@ -76,19 +104,69 @@ class HumanizeResponse(BaseModel):
                 "new_sentence_count": 3,
                 "words_added": 2,
                 "sentences_added": 1,
+                "seed": 42,
+                "cached": False,
+                "timings": None,
             }
         }
 
 
+def _request_stages(req):
+    try:
+        return resolve_stages(req.stages)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+# Startup state reported by /ready; filled in by the background preload thread.
+readiness = {"status": "loading", "models": {}, "detail": None}
+
+
+def _warm_humanizer(_):
+    # Touches spaCy, the WordNet corpus reader and Punkt so the first request doesn't.
+    preserve_linebreaks_rewrite(" ".join(WARMUP_SENTENCES), p_syn=1.0, p_trans=1.0)
+
+
+def _preload():
+    try:
+        names = PRELOAD_MODELS or ["humanizer"]
+        readiness["models"] = preload_models(names, warmers={"humanizer": (lambda: nlp, _warm_humanizer)})
+        readiness["status"] = "ready"
+    except Exception as exc:
+        logger.exception("Model preload failed")
+        readiness["status"] = "error"
+        readiness["detail"] = str(exc)
+
+
+@app.on_event("startup")
+def start_preload():
+    """Preload and warm up configured models (PRELOAD_MODELS, default: humanizer) in the background."""
+    threading.Thread(target=_preload, name="model-preload", daemon=True).start()
+
+
 @app.get("/health", tags=["humanize"], summary="Health check")
 def health():
     """Returns OK when the service is healthy.
 
-    Useful for simple uptime checks.
+    Useful for simple uptime checks. This is a liveness check only; use `/ready`
+    to know whether models are loaded.
     """
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["humanize"], summary="Readiness check")
+def ready():
+    """Returns 200 once all configured models are loaded and warmed up, 503 before that.
+
+    The response lists per-model load time, warm-up time and resident memory, plus the
+    inference governor's concurrency, queue depth and wait-time metrics and the
+    humanize result cache's size and hit rate.
+    """
+    status_code = 200 if readiness["status"] == "ready" else 503
+    content = dict(readiness, inference=inference_stats(), humanize_cache=humanize_cache_stats())
+    return JSONResponse(status_code=status_code, content=content)
+
+
 @app.post(
     "/humanize",
     response_model=HumanizeResponse,
@@ -105,47 +183,86 @@ def humanize(req: HumanizeRequest):
     - Expand contractions, replace synonyms, and optionally add academic transitions
 
     Provide `p_syn` and `p_trans` to tune intensity of synonym replacement and
-    transition insertion respectively (values between 0.0 and 1.0).
+    transition insertion respectively (values between 0.0 and 1.0). Pass `seed`
+    for reproducible output; seeded results are cached. `stages` turns stages
+    off or swaps their order, and `timings: true` adds per-stage wall time and
+    allocations (measured with tracemalloc, which slows the request down).
     """
     text = req.text or ""
     if not text.strip():
         raise HTTPException(status_code=400, detail="`text` must be a non-empty string")
+    stages = _request_stages(req)
 
-    # Original stats
-    orig_wc = count_words(text)
-    orig_sc = count_sentences(text)
+    timings = StageTimings() if req.timings else None
+    with timings if timings is not None else nullcontext():
+        result = humanize_document(
+            text,
+            p_syn=req.p_syn,
+            p_trans=req.p_trans,
+            preserve_linebreaks=req.preserve_linebreaks,
+            seed=req.seed,
+            stages=stages,
+            timings=timings,
+        )
+        final_text = result["text"]
 
-    # Protect citations
-    no_refs_text, placeholders = extract_citations(text)
-
-    # Choose rewrite mode
-    if req.preserve_linebreaks:
-        rewritten = preserve_linebreaks_rewrite(no_refs_text, p_syn=req.p_syn, p_trans=req.p_trans)
-    else:
-        rewritten = minimal_rewriting(no_refs_text, p_syn=req.p_syn, p_trans=req.p_trans)
-
-    # Restore citations and normalize spacing similar to Streamlit page
-    final_text = restore_citations(rewritten, placeholders)
-    final_text = re.sub(r"[ \t]+([.,;:!?])", r"\1", final_text)
-    final_text = re.sub(r"(\()[ \t]+", r"\1", final_text)
-    final_text = re.sub(r"[ \t]+(\))", r"\1", final_text)
-    final_text = re.sub(r"[ \t]{2,}", " ", final_text)
-    final_text = re.sub(r"``\s*(.+?)\s*''", r'"\1"', final_text)
-
-    new_wc = count_words(final_text)
-    new_sc = count_sentences(final_text)
+        # Count both texts in one mode so the deltas compare like with like.
+        with measure(timings, "stats"):
+            mode = comparison_mode(text, final_text)
+            orig_stats = document_stats(text, mode)
+            new_stats = document_stats(final_text, mode)
 
     return {
         "humanized_text": final_text,
-        "orig_word_count": orig_wc,
-        "orig_sentence_count": orig_sc,
-        "new_word_count": new_wc,
-        "new_sentence_count": new_sc,
-        "words_added": new_wc - orig_wc,
-        "sentences_added": new_sc - orig_sc,
+        "orig_word_count": orig_stats.words,
+        "orig_sentence_count": orig_stats.sentences,
+        "new_word_count": new_stats.words,
+        "new_sentence_count": new_stats.sentences,
+        **orig_stats.delta(new_stats),
+        "seed": result["seed"],
+        "cached": result["cached"],
+        "timings": timings.as_dict() if timings is not None else None,
     }
 
 
+@app.post(
+    "/humanize/stream",
+    tags=["humanize"],
+    summary="Humanize input text as a stream",
+    response_description="NDJSON: one object per line of input, then a final summary object",
+)
+def humanize_streaming(req: HumanizeRequest):
+    """Stream the humanized text line by line as newline-delimited JSON.
+
+    Each input line produces `{"index": n, "text": "..."}` as soon as its chunk of
+    paragraphs is rewritten (blank lines come back with empty text), in order;
+    joining the `text` values with newlines gives the full result. The stream ends
+    with `{"done": true, "seed": ..., "lines": ...}`, plus `"timings"` when they
+    were requested. Line breaks are always preserved, and memory stays bounded
+    by the chunk size rather than the document.
+    """
+    text = req.text or ""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="`text` must be a non-empty string")
+    stages = _request_stages(req)
+    seed = req.seed if req.seed is not None else random.SystemRandom().getrandbits(63)
+
+    def ndjson():
+        lines = 0
+        timings = StageTimings() if req.timings else None
+        with timings if timings is not None else nullcontext():
+            for item in humanize_stream(text, p_syn=req.p_syn, p_trans=req.p_trans, seed=seed,
+                                        stages=stages, timings=timings):
+                lines += 1
+                yield json.dumps(item) + "\n"
+        summary = {"done": True, "seed": seed, "lines": lines}
+        if timings is not None:
+            summary["timings"] = timings.as_dict()
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 # if __name__ == "__main__":
 #     # Quick developer run: python api/humanize_api.py
 #     import uvicorn
@@ -0,0 +1,123 @@
+"""
+Benchmark: linear-time citation scanner vs the reference regex.
+
+1. Equivalence: find_citations must return exactly the spans and styles of
+   CITATION_REGEX.finditer on well-formed citations of every style and on
+   random fuzz strings built from citation fragments.
+2. Adversarial inputs (long parentheticals without a year, long runs of
+   openers, long MLA/numeric runs): the scanner's time per input character
+   must stay flat as inputs grow, while the regex is shown for comparison on
+   the smaller sizes.
+
+    python -m benchmarks.citation_scanner --fuzz 100000 --sizes 2000 20000 200000
+"""
+import argparse
+import random
+import sys
+import time
+from utils.citations import CITATION_REGEX, find_citations
+
+WELL_FORMED = [
+    "(Smith, 2020)",
+    "(Smith et al., 2020)",
+    "( Karaman & Frazzoli, 2011, pp. 83-86 )",
+    "(Brown, 2019, p. 7)",
+    "(O'Neil-Smith, Jones, & Lee, 2018)",
+    "[12]",
+    "[3, 7]",
+    "[4-6]",
+    "[ 1; 2 ]",
+    "[8–9]",
+    "(Smith 45)",
+    "(Lee and Park 12-14)",
+    "(Lee, and Park 12)",
+    "(Lee & Park 3)",
+    "(Lee et al. 7)",
+    "(Smith  45 – 47 )",
+]
+
+FRAGMENTS = list("()[] ,.;&-'–\t\nAaSpe0123456789٣") + [
+    "and", "et al.", "pp.", "p.", "2020", "Smith", "Lee", " ", "  ",
+] + WELL_FORMED
+
+ADVERSARIAL = {
+    "paren + spaces, no year": lambda n: "(" + " " * n + "x",
+    "paren + words and commas, no year": lambda n: "(" + "a, b " * (n // 5) + "x",
+    "repeated unclosed APA": lambda n: "(a, 2020 " * (n // 9),
+    "MLA name + spaces": lambda n: "(Smith" + " " * n,
+    "numeric run unclosed": lambda n: "[1" + " ,1" * (n // 3),
+    "openers only": lambda n: "([" * (n // 2),
+}
+
+
+def spans_regex(text):
+    return [(m.start(), m.end(), m.lastgroup) for m in CITATION_REGEX.finditer(text)]
+
+
+def spans_scanner(text):
+    return list(find_citations(text))
+
+
+def check_equivalence(fuzz, seed):
+    rng = random.Random(seed)
+    failures = []
+    for citation in WELL_FORMED:
+        for text in (citation, f"As shown {citation}, results hold.", f"{citation}{citation}"):
+            if spans_regex(text) != spans_scanner(text):
+                failures.append(text)
+    matched = 0
+    for _ in range(fuzz):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 24)))
+        expected = spans_regex(text)
+        matched += len(expected)
+        if expected != spans_scanner(text):
+            failures.append(text)
+    return failures, matched
+
+
+def ns_per_char(fn, text):
+    start = time.perf_counter()
+    fn(text)
+    return (time.perf_counter() - start) * 1e9 / max(1, len(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fuzz", type=int, default=100000, help="Random fuzz strings to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000, 200000])
+    parser.add_argument("--regex-max-size", type=int, default=20000,
+                        help="Largest input the (possibly quadratic) regex is timed on")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="Allowed ratio of ns/char between the largest and smallest size")
+    args = parser.parse_args()
+
+    failures, matched = check_equivalence(args.fuzz, args.seed)
+    print(f"equivalence: {len(failures)} mismatches ({matched} citations in fuzz inputs)")
+    for text in failures[:10]:
+        print(f"  {text!r}: regex={spans_regex(text)} scanner={spans_scanner(text)}")
+    ok = not failures
+
+    for name, build in ADVERSARIAL.items():
+        scanner_costs = []
+        row = []
+        for size in args.sizes:
+            text = build(size)
+            cost = ns_per_char(spans_scanner, text)
+            scanner_costs.append(cost)
+            regex = (f"{ns_per_char(spans_regex, text):9.0f}"
+                     if size <= args.regex_max_size else "        -")
+            row.append(f"{size:>7}: scanner {cost:6.0f} regex {regex} ns/char")
+        growth = max(scanner_costs) / min(scanner_costs)
+        bounded = growth <= args.max_growth
+        ok = ok and bounded
+        print(f"{name} (growth x{growth:.2f}{'' if bounded else ' UNBOUNDED'})")
+        for line in row:
+            print(f"  {line}")
+
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark: span-based citation protector vs the previous findall + str.replace
+implementation.
+
+Builds documents with thousands of APA, numeric and MLA citations (with many
+duplicates), checks that protect/restore round-trips exactly and that every
+citation style is protected, then times both implementations.
+
+    python -m benchmarks.citations --citations 1000 5000
+"""
+import argparse
+import re
+import sys
+import time
+from utils.citations import find_citations, protect_citations, restore_citations
+
+LEGACY_CITATION_REGEX = re.compile(
+    r"\(\s*[A-Za-z&\-,\.\s]+(?:et al\.\s*)?,\s*\d{4}(?:,\s*(?:pp?\.\s*\d+(?:-\d+)?))?\s*\)"
+)
+LEGACY_PLACEHOLDER_REGEX = re.compile(r"\[\s*\[\s*REF_(\d+)\s*\]\s*\]")
+
+CITATIONS = [
+    ("apa", "(Smith et al., 2020)"),
+    ("apa", "(Karaman & Frazzoli, 2011, pp. 83-86)"),
+    ("numeric", "[12]"),
+    ("numeric", "[3, 7]"),
+    ("mla", "(Smith 45)"),
+    ("mla", "(Lee and Park 12-14)"),
+]
+
+
+def legacy_extract_citations(text):
+    refs = LEGACY_CITATION_REGEX.findall(text)
+    placeholder_map = {}
+    replaced_text = text
+    for i, r in enumerate(refs, start=1):
+        placeholder = f"[[REF_{i}]]"
+        placeholder_map[placeholder] = r
+        replaced_text = replaced_text.replace(r, placeholder, 1)
+    return replaced_text, placeholder_map
+
+
+def legacy_restore_citations(text, placeholder_map):
+    def replace_placeholder(match):
+        key = f"[[REF_{match.group(1)}]]"
+        return placeholder_map.get(key, match.group(0))
+    return LEGACY_PLACEHOLDER_REGEX.sub(replace_placeholder, text)
+
+
+def build_document(n_citations):
+    sentences = []
+    for i in range(n_citations):
+        _, citation = CITATIONS[i % len(CITATIONS)]
+        sentences.append(f"Finding number {i} was replicated in later work {citation}.")
+    return " ".join(sentences)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--citations", type=int, nargs="+", default=[1000, 5000])
+    args = parser.parse_args()
+
+    ok = True
+    for n in args.citations:
+        text = build_document(n)
+
+        styles = [style for _, _, style in find_citations(text)]
+        expected = [CITATIONS[i % len(CITATIONS)][0] for i in range(n)]
+        if styles != expected:
+            ok = False
+            print(f"n={n}: detected styles differ from the inserted ones")
+
+        (protected, citations), new_protect_ms = timed(protect_citations, text)
+        restored, new_restore_ms = timed(restore_citations, protected, citations)
+        if restored != text or len(citations) != n:
+            ok = False
+            print(f"n={n}: round trip failed ({len(citations)} citations protected)")
+
+        (legacy_protected, mapping), legacy_protect_ms = timed(legacy_extract_citations, text)
+        _, legacy_restore_ms = timed(legacy_restore_citations, legacy_protected, mapping)
+
+        print(f"n={n:<6} legacy protect {legacy_protect_ms:9.1f} ms  restore {legacy_restore_ms:7.1f} ms "
+              f"({len(mapping)} protected, APA only)")
+        print(f"{'':8} span   protect {new_protect_ms:9.1f} ms  restore {new_restore_ms:7.1f} ms "
+              f"({len(citations)} protected)")
+
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
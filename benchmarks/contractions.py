@@ -0,0 +1,112 @@
+"""
+Benchmark: precompiled single-pass contraction engine vs the previous
+expand_contractions implementation.
+
+Checks that both produce the same token stream on a golden corpus, then times
+them on a large input. The previous implementation is reproduced here verbatim
+as the reference.
+
+    python -m benchmarks.contractions --repeat 2000
+"""
+import argparse
+import re
+import sys
+import time
+from nltk.tokenize import word_tokenize
+from utils.contractions import WHOLE_CONTRACTIONS, SUFFIX_CONTRACTIONS, expand_contractions_raw
+
+GOLDEN = [
+    "I can't believe it's already Monday.",
+    "We're sure they're right, but you're not.",
+    "He's said she's coming; that's fine, isn't it?",
+    "Don't worry: the results didn't change and won't change.",
+    "There's a reason what's done can't be undone.",
+    "Let's assume the model doesn't converge.",
+    "IT'S LOUD and Can't be ignored.",
+    "They couldn't, shouldn't and wouldn't agree.",
+    "The author's claim hasn't been tested; we haven't tried and hadn't planned to.",
+    "I'm certain you'll see why we'd stop, and I've said so.",
+    "\"Don't panic,\" she said, \"it isn't over.\"",
+    "Recent studies [[REF_1]] show that they aren't wrong and weren't lying.",
+    "Mustn't we? Ain't nobody got time.",
+    "No contractions in this sentence at all.",
+]
+
+
+def legacy_expand_contractions(sentence):
+    def _replace_whole_with_quotes(match):
+        open_tok = match.group(1) or ""
+        word = match.group('word')
+        close_tok = match.group(3) or ""
+        key = word.lower()
+        repl = WHOLE_CONTRACTIONS.get(key, word)
+        if word and word[0].isupper():
+            repl = repl.capitalize()
+        return f"{open_tok}{repl}{close_tok}"
+
+    alt = "|".join(re.escape(k) for k in WHOLE_CONTRACTIONS.keys())
+    whole_pattern = rf"(?:(``)\s*)?(?P<word>(?:{alt}))(?:\s*(''))?"
+    sentence = re.sub(whole_pattern, _replace_whole_with_quotes, sentence, flags=re.IGNORECASE)
+
+    tokens = word_tokenize(sentence)
+    out_tokens = []
+    for t in tokens:
+        lower_t = t.lower()
+        replaced = False
+        for contr, expansion in SUFFIX_CONTRACTIONS.items():
+            if lower_t.endswith(contr):
+                base = lower_t[: -len(contr)]
+                new_t = base + expansion
+                if t and t[0].isupper():
+                    new_t = new_t.capitalize()
+                out_tokens.append(new_t)
+                replaced = True
+                break
+        if not replaced:
+            out_tokens.append(t)
+    return " ".join(out_tokens)
+
+
+def engine_expand_contractions(sentence):
+    return " ".join(word_tokenize(expand_contractions_raw(sentence)))
+
+
+def check_golden():
+    failures = 0
+    for sentence in GOLDEN:
+        # The legacy version leaves double spaces where a suffix token was expanded;
+        # compare token streams (the post-processing collapses those spaces anyway).
+        expected = legacy_expand_contractions(sentence).split()
+        actual = engine_expand_contractions(sentence).split()
+        if expected != actual:
+            failures += 1
+            print(f"MISMATCH {sentence!r}\n  legacy: {expected}\n  engine: {actual}")
+    print(f"golden corpus: {len(GOLDEN) - failures}/{len(GOLDEN)} identical")
+    return failures
+
+
+def bench(fn, sentences):
+    start = time.perf_counter()
+    for sentence in sentences:
+        fn(sentence)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=1000, help="Copies of the golden corpus to time")
+    args = parser.parse_args()
+
+    failures = check_golden()
+    sentences = GOLDEN * args.repeat
+    big_text = " ".join(sentences)
+    legacy = bench(legacy_expand_contractions, sentences)
+    engine = bench(engine_expand_contractions, sentences)
+    raw = bench(expand_contractions_raw, [big_text])
+    print(f"{len(sentences)} sentences: legacy {legacy:.3f}s, engine {engine:.3f}s "
+          f"(x{legacy / engine:.1f}); raw single pass over {len(big_text)} chars {raw:.3f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
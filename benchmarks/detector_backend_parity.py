@@ -0,0 +1,69 @@
+"""
+Parity check between the PyTorch detector and an ONNX Runtime backend.
+
+Runs a fixed corpus through both pipelines and reports label agreement and
+score drift. Exits non-zero when labels disagree or scores drift beyond the
+tolerance.
+
+    python -m benchmarks.detector_backend_parity --backend onnx-int8
+"""
+import argparse
+import sys
+import time
+from utils.model_loaders import load_detector_model
+
+CORPUS = [
+    "The results indicate a statistically significant improvement over the baseline.",
+    "I honestly didn't expect the bus to be that late, so I just walked home.",
+    "In conclusion, artificial intelligence has the potential to transform many industries.",
+    "My grandmother's recipe calls for a pinch of salt and way too much butter.",
+    "This paper proposes a novel framework for robust multi-agent path planning.",
+    "We went to the lake on Sunday and the dog refused to get out of the water.",
+    "Furthermore, it is important to note that these findings have several limitations.",
+    "Ugh, the printer jammed again right before my deadline.",
+    "Large language models are trained on vast amounts of text data from the internet.",
+    "The committee will reconvene next Tuesday to finalise the budget.",
+    "Overall, the proposed approach offers a scalable and efficient solution.",
+    "Short one.",
+]
+
+
+def run(backend, tolerance):
+    reference = load_detector_model("torch")
+    candidate = load_detector_model(backend)
+
+    start = time.perf_counter()
+    expected = reference(CORPUS, truncation=True)
+    torch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = candidate(CORPUS, truncation=True)
+    backend_seconds = time.perf_counter() - start
+
+    mismatches = 0
+    max_delta = 0.0
+    for sentence, ref, out in zip(CORPUS, expected, actual):
+        delta = abs(ref["score"] - out["score"])
+        max_delta = max(max_delta, delta)
+        if ref["label"] != out["label"] or delta > tolerance:
+            mismatches += 1
+            print(f"MISMATCH {ref['label']}/{ref['score']:.4f} vs {out['label']}/{out['score']:.4f}: {sentence}")
+
+    print(f"backend={backend} sentences={len(CORPUS)} mismatches={mismatches} max_score_delta={max_delta:.4f}")
+    print(f"torch={torch_seconds:.3f}s {backend}={backend_seconds:.3f}s")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", default="onnx-int8", choices=["onnx", "onnx-int8"])
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Max absolute score delta (default: 1e-3 for onnx, 5e-2 for onnx-int8)")
+    args = parser.parse_args()
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = 1e-3 if args.backend == "onnx" else 5e-2
+    sys.exit(1 if run(args.backend, tolerance) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: DocumentStats counting modes against NLTK.
+
+Checks that the "nltk" mode matches len(word_tokenize(text)) and
+len(sent_tokenize(text)) exactly, that the "fast" regex mode stays within the
+given relative tolerances of them on a mixed corpus, and times both modes on a
+large input.
+
+    python -m benchmarks.document_stats --repeat 500
+"""
+import argparse
+import sys
+import time
+from nltk.tokenize import sent_tokenize, word_tokenize
+from utils.document_stats import DocumentStats
+
+CORPUS = [
+    "I can't believe it's already Monday. We're sure they're right, but you're not!",
+    "Recent studies (Smith et al., 2020) show that 1,000 samples cost $3.50 each. Really?",
+    "\"Don't panic,\" she said. \"It isn't over.\"",
+    "The well-known case -- which cannot be ignored -- is 5.5% cheaper; it's remarkable.",
+    "Deep learning models [12] outperform classical baselines (Jones, 2019, p. 4).",
+    "Multiple\n\nparagraphs. Here it is (see [3]).\nAnother line without a stop",
+    "Is it true? Yes! Absolutely... We checked twice, and the results hold.",
+    "The author's claim hasn't been tested; we haven't tried and hadn't planned to.",
+    "Transformers (Vaswani et al., 2017) changed NLP; RoBERTa followed in 2019.",
+    "Results were mixed: 42 of 50 runs converged, 8 did not.",
+]
+
+
+def relative_error(approx, exact):
+    return abs(approx - exact) / exact if exact else float(approx != exact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=500,
+                        help="Times the corpus is repeated for the timing run")
+    parser.add_argument("--word-tolerance", type=float, default=0.03,
+                        help="Allowed relative error of fast-mode word counts on the corpus")
+    parser.add_argument("--sentence-tolerance", type=float, default=0.10,
+                        help="Allowed relative error of fast-mode sentence counts on the corpus")
+    args = parser.parse_args()
+
+    ok = True
+    for text in CORPUS:
+        exact_words = len(word_tokenize(text))
+        exact_sentences = len(sent_tokenize(text))
+        nltk_stats = DocumentStats.from_text(text, "nltk")
+        if (nltk_stats.words, nltk_stats.sentences) != (exact_words, exact_sentences):
+            ok = False
+            print(f"nltk mode mismatch: {nltk_stats!r} vs ({exact_words}, {exact_sentences}): {text!r}")
+
+    joined = "\n".join(CORPUS)
+    exact = DocumentStats.from_text(joined, "nltk")
+    fast = DocumentStats.from_text(joined, "fast")
+    word_error = relative_error(fast.words, exact.words)
+    sentence_error = relative_error(fast.sentences, exact.sentences)
+    print(f"corpus words      nltk={exact.words:<6} fast={fast.words:<6} error={word_error:.2%}")
+    print(f"corpus sentences  nltk={exact.sentences:<6} fast={fast.sentences:<6} error={sentence_error:.2%}")
+    ok = ok and word_error <= args.word_tolerance and sentence_error <= args.sentence_tolerance
+
+    large = "\n".join(CORPUS * args.repeat)
+    for mode in ("nltk", "fast"):
+        start = time.perf_counter()
+        stats = DocumentStats.from_text(large, mode)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<5} {len(large):>10,} chars  {elapsed * 1000:9.1f} ms  {stats!r}")
+
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
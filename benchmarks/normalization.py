@@ -0,0 +1,76 @@
+"""
+Benchmark: single-pass normalize_spacing vs the previous five sequential
+re.sub passes.
+
+Checks byte-identical output on a golden corpus and on random fuzz strings
+built from whitespace, punctuation and tokenized quotes, then times both on a
+large humanizer-like output.
+
+    python -m benchmarks.normalization --fuzz 200000 --lines 20000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from utils.normalization import normalize_spacing
+
+GOLDEN = [
+    "Moreover , the results ( Smith et al. , 2020 ) show that `` the model is robust '' ; we agree .",
+    "It can not be ignored  !  Really ?",
+    "Tabs\tand  spaces\t\tmix ( here ) .",
+    "`` Don't panic , '' she said . `` It is not over . ''",
+    "Empty quotes ``  '' and `` \t'' and ``\n'' stay tricky.",
+    "Unclosed `` quote on this line\nand '' on the next.",
+    "(  nested ( parentheses  )  ) : done",
+    "Line one .  \nLine two ,\tstill .",
+]
+
+FRAGMENTS = list(" \t\n\r\x0b.,;:!?()`'ax") + ["``", "''", "  ", "\t ", "( ", "`` ", " ''", " ."]
+
+
+def legacy_normalize(text):
+    text = re.sub(r"[ \t]+([.,;:!?])", r"\1", text)
+    text = re.sub(r"(\()[ \t]+", r"\1", text)
+    text = re.sub(r"[ \t]+(\))", r"\1", text)
+    text = re.sub(r"[ \t]{2,}", " ", text)
+    text = re.sub(r"``\s*(.+?)\s*''", r'"\1"', text)
+    return text
+
+
+def timed(fn, text):
+    start = time.perf_counter()
+    result = fn(text)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fuzz", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lines", type=int, default=20000,
+                        help="Golden corpus repetitions for the timing run")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    inputs = list(GOLDEN)
+    inputs.extend("".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 24)))
+                  for _ in range(args.fuzz))
+    failures = [text for text in inputs if normalize_spacing(text) != legacy_normalize(text)]
+    print(f"byte-identical: {len(inputs) - len(failures)}/{len(inputs)}")
+    for text in failures[:10]:
+        print(f"  {text!r}: legacy={legacy_normalize(text)!r} fused={normalize_spacing(text)!r}")
+
+    large = "\n".join(GOLDEN * args.lines)
+    expected, legacy_ms = timed(legacy_normalize, large)
+    result, fused_ms = timed(normalize_spacing, large)
+    print(f"{len(large):,} chars  legacy {legacy_ms:8.1f} ms  fused {fused_ms:8.1f} ms  "
+          f"identical={result == expected}")
+
+    ok = not failures and result == expected
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
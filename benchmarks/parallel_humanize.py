@@ -0,0 +1,69 @@
+"""
+Benchmark: paragraph-parallel humanization.
+
+Rewrites a multi-paragraph document with a fixed seed for several worker
+counts, checks that every run produces the same text and line structure as
+the in-process run, and reports wall time per worker count. Also checks that
+the streaming path splits "\r"-only line endings the same way.
+
+    python -m benchmarks.parallel_humanize --paragraphs 200 --workers 1 2 4
+"""
+import argparse
+import sys
+import time
+from pages.humanize_text import humanize_stream, preserve_linebreaks_rewrite
+
+PARAGRAPH = (
+    "Recent studies (Smith et al., 2020) show that the method doesn't converge on small datasets. "
+    "We're confident the results are robust, but further work is needed. "
+    "The proposed approach improves accuracy while reducing computational cost."
+)
+
+
+def build_document(paragraphs):
+    lines = []
+    for i in range(paragraphs):
+        lines.append(f"{i}. {PARAGRAPH}")
+        if i % 3 == 2:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--p-syn", type=float, default=0.5)
+    parser.add_argument("--p-trans", type=float, default=0.5)
+    args = parser.parse_args()
+
+    text = build_document(args.paragraphs)
+    reference = preserve_linebreaks_rewrite(text, p_syn=args.p_syn, p_trans=args.p_trans,
+                                            seed=args.seed, workers=1)
+    ok = len(reference.splitlines()) == len(text.splitlines())
+    for workers in args.workers:
+        # First call spins up the pool; time the second.
+        preserve_linebreaks_rewrite(text, p_syn=args.p_syn, p_trans=args.p_trans,
+                                    seed=args.seed, workers=workers)
+        start = time.perf_counter()
+        output = preserve_linebreaks_rewrite(text, p_syn=args.p_syn, p_trans=args.p_trans,
+                                             seed=args.seed, workers=workers)
+        elapsed = time.perf_counter() - start
+        same = output == reference
+        ok = ok and same
+        print(f"workers={workers:<3} {elapsed * 1000:9.1f} ms  identical={same}")
+
+    streamed = "\n".join(item["text"] for item in humanize_stream(
+        text.replace("\n", "\r"), p_syn=args.p_syn, p_trans=args.p_trans, seed=args.seed,
+        workers=1, chunk_chars=2000))
+    same = streamed == reference
+    ok = ok and same
+    print(f"stream (\\r endings)  identical={same}")
+
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
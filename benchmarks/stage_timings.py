@@ -0,0 +1,72 @@
+"""
+Benchmark: per-stage wall time and allocations of the humanizer pipeline.
+
+Humanizes a generated document with timings on and prints one row per stage,
+then repeats the run with each optional stage left out to show what turning
+it off saves. Checks that a run without synonyms and transitions adds no
+words, and that timings do not change the output.
+
+    python -m benchmarks.stage_timings --paragraphs 200
+"""
+import argparse
+import sys
+import time
+from pages.humanize_text import HUMANIZE_STAGES, humanize_cache, humanize_document
+from benchmarks.parallel_humanize import build_document
+from utils.document_stats import comparison_mode, document_stats
+from utils.stage_timings import StageTimings
+
+
+def run(text, seed, stages=None, track_memory=None):
+    # Every run recomputes; seeded results would otherwise come from the cache.
+    humanize_cache.clear()
+    start = time.perf_counter()
+    if track_memory is None:
+        result = humanize_document(text, p_syn=0.5, p_trans=0.5, seed=seed, stages=stages)
+        return result["text"], None, (time.perf_counter() - start) * 1000
+    with StageTimings(track_memory=track_memory) as timings:
+        result = humanize_document(text, p_syn=0.5, p_trans=0.5, seed=seed, stages=stages,
+                                   timings=timings)
+    return result["text"], timings, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    ok = True
+    text = build_document(args.paragraphs)
+    plain, _, plain_ms = run(text, args.seed)
+    timed_text, timings, _ = run(text, args.seed + 1, track_memory=False)
+    traced_text, traced, traced_ms = run(text, args.seed + 1, track_memory=True)
+    if timed_text != traced_text:
+        ok = False
+        print("output differs with allocation tracking on")
+
+    print(f"{len(text):,} chars, full pipeline {plain_ms:.1f} ms "
+          f"({traced_ms:.1f} ms with tracemalloc)")
+    print(f"{'stage':<14}{'calls':>7}{'ms':>11}{'allocated':>14}{'peak':>14}")
+    for name, stage in traced.as_dict().items():
+        ms = timings.stages.get(name, {}).get("ms", stage["ms"])
+        print(f"{name:<14}{stage['calls']:>7}{ms:>11.1f}"
+              f"{stage['allocated_bytes']:>14,}{stage['peak_bytes']:>14,}")
+
+    for name in HUMANIZE_STAGES:
+        stages = [stage for stage in HUMANIZE_STAGES if stage != name]
+        _, _, ms = run(text, args.seed + 2, stages=stages)
+        print(f"without {name:<13} {ms:9.1f} ms")
+
+    unchanged, _, _ = run(text, args.seed + 3, stages=["citations", "contractions", "normalize"])
+    mode = comparison_mode(text, unchanged)
+    if document_stats(unchanged, mode).words > document_stats(text, mode).words:
+        ok = False
+        print("words were added with synonyms and transitions disabled")
+
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark: memory-mapped synonym index vs the WordNet corpus reader.
+
+Builds the index into a temporary file (or opens --index), then checks on a
+sample of lemma names and inflected/exception forms that SynonymIndex.morphy
+matches wordnet._morphy, that known() matches bool(wordnet.synsets(word)) and
+that synonyms() matches the corpus fallback in
+utils.humanize_pipeline.get_synonyms (same names, same order). Finally times lookups through both paths.
+
+    python -m benchmarks.synonym_index --sample 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from nltk.corpus import wordnet
+from utils.synonym_index import POS_LIST, SynonymIndex, build_synonym_index
+
+SUFFIXES = ("s", "es", "ies", "ed", "ing", "er", "est", "men", "ves")
+
+
+def sample_forms(rng, size):
+    """Lemma names, inflected variants and exception-list forms to check."""
+    forms = set()
+    for pos in POS_LIST:
+        lemmas = sorted(wordnet.all_lemma_names(pos=pos))
+        for lemma in rng.sample(lemmas, min(size, len(lemmas))):
+            forms.add(lemma)
+            forms.add(lemma + rng.choice(SUFFIXES))
+        exceptions = sorted(wordnet._exception_map[pos])
+        forms.update(rng.sample(exceptions, min(size // 10, len(exceptions))))
+    forms.update(["", "xyzzy", "Running", "GEESE", "better", "ran"])
+    return sorted(forms)
+
+
+def corpus_synonyms(word, pos):
+    # Same as the fallback branch of utils.humanize_pipeline.get_synonyms.
+    synonyms = []
+    for syn in wordnet.synsets(word, pos=pos):
+        for lemma in syn.lemmas():
+            name = lemma.name().replace("_", " ")
+            if name.lower() != word.lower() and name not in synonyms:
+                synonyms.append(name)
+    return synonyms
+
+
+def timed(fn, forms):
+    start = time.perf_counter()
+    for form in forms:
+        for pos in POS_LIST:
+            fn(form, pos)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample", type=int, default=5000, help="Lemma names sampled per POS")
+    parser.add_argument("--index", help="Existing index file to check instead of building one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.index:
+        path = args.index
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "wordnet_synonyms.idx")
+        start = time.perf_counter()
+        keys = build_synonym_index(path)
+        print(f"built {keys} keys in {time.perf_counter() - start:.1f}s")
+    index = SynonymIndex(path)
+
+    forms = sample_forms(random.Random(args.seed), args.sample)
+    mismatches = 0
+    for form in forms:
+        if index.known(form) != bool(wordnet.synsets(form)):
+            mismatches += 1
+            print(f"known({form!r}) differs")
+        for pos in POS_LIST:
+            lowered = form.lower()
+            if index.morphy(lowered, pos) != wordnet._morphy(lowered, pos):
+                mismatches += 1
+                print(f"morphy({lowered!r}, {pos}): index {index.morphy(lowered, pos)} "
+                      f"vs wordnet {wordnet._morphy(lowered, pos)}")
+            if index.synonyms(form, pos) != corpus_synonyms(form, pos):
+                mismatches += 1
+                print(f"synonyms({form!r}, {pos}) differ")
+    print(f"{len(forms)} forms x {len(POS_LIST)} POS checked, {mismatches} mismatches")
+
+    corpus_ms = timed(corpus_synonyms, forms)
+    index_ms = timed(index.synonyms, forms)
+    print(f"synonym lookups: corpus {corpus_ms:.1f} ms, index {index_ms:.1f} ms")
+
+    print("OK" if not mismatches else "MISMATCH")
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Benchmark: single-parse TokenDocument building and rendering vs the previous
+per-sentence string pipeline.
+
+The legacy path expanded contractions, tokenized each sentence with NLTK,
+joined the tokens into a string and split it again for the tagger. The
+TokenDocument path expands and tokenizes once per paragraph and renders once.
+Checks that rendering an unedited document keeps every citation verbatim and
+the expanded text otherwise unchanged, then times both paths (without spaCy,
+so only the string work is compared).
+
+    python -m benchmarks.token_document --paragraphs 200 2000
+"""
+import argparse
+import re
+import sys
+import time
+from nltk.tokenize import NLTKWordTokenizer
+from utils.citations import find_citations
+from utils.contractions import expand_contractions_raw
+from utils.token_document import build_documents
+
+PARAGRAPH = (
+    "We can't ignore the results (Smith et al., 2020). It's clear that the method "
+    "doesn't scale [12], yet \"robust\" baselines (Lee 12) still hold. They'd agree."
+)
+_SENTENCE_REGEX = re.compile(r"(?:[^.!?(]|\([^)]*\))+[.!?]+")
+
+
+def sentence_spans(text):
+    # Punkt-free splitting, so the benchmark does not need NLTK data.
+    return [m.span() for m in _SENTENCE_REGEX.finditer(text)]
+
+
+def legacy_pipeline(paragraphs, tokenizer):
+    out = []
+    for paragraph in paragraphs:
+        sentences = []
+        for start, end in sentence_spans(paragraph):
+            line = " ".join(tokenizer.tokenize(expand_contractions_raw(paragraph[start:end])))
+            sentences.append(" ".join(line.split()))
+        out.append(" ".join(sentences))
+    return out
+
+
+def document_pipeline(paragraphs):
+    documents = build_documents(paragraphs, spans=[sentence_spans(p) for p in paragraphs])
+    return [document.render() for document in documents]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[200, 2000])
+    args = parser.parse_args()
+
+    ok = True
+    tokenizer = NLTKWordTokenizer()
+    for n in args.paragraphs:
+        paragraphs = [f"Paragraph {i}. {PARAGRAPH}" for i in range(n)]
+        rendered, document_ms = timed(document_pipeline, paragraphs)
+        _, legacy_ms = timed(legacy_pipeline, paragraphs, tokenizer)
+
+        for paragraph, output in zip(paragraphs, rendered):
+            expected = " ".join(expand_contractions_raw(paragraph).split())
+            citations = [paragraph[s:e] for s, e, _ in find_citations(paragraph)]
+            if output != expected or [output[s:e] for s, e, _ in find_citations(output)] != citations:
+                ok = False
+                print(f"n={n}: unedited render differs: {output!r}")
+                break
+
+        print(f"n={n:<6} legacy {legacy_ms:9.1f} ms   token document {document_ms:9.1f} ms")
+
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
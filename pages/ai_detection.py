@@ -3,7 +3,7 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 from utils.pdf_utils import extract_text_from_pdf, generate_annotated_pdf, word_count
-from utils.ai_detection_utils import classify_text_hf  # Defined in utils/ai_detection_utils.py
+from utils.ai_detection_utils import classify_text_hf_stream, detection_cache_stats  # Defined in utils/ai_detection_utils.py
 from io import BytesIO
 
 def show_pdf_detection_page():
@@ -118,11 +118,20 @@ def show_pdf_detection_page():
                 st.session_state["pdf_processed"] = False
                 return
 
-            with st.spinner("🤖 Analyzing content with AI detection..."):
-                c_map, pcts = classify_text_hf(
-                    st.session_state["original_pdf_text"])
-                st.session_state["classification_map"] = c_map
-                st.session_state["percentages"] = pcts
+            st.markdown("🤖 Analyzing content with AI detection...")
+            progress_bar = st.progress(0)
+            partial_results = st.empty()
+            c_map = {}
+            pcts = None
+            for chunk in classify_text_hf_stream(st.session_state["original_pdf_text"]):
+                c_map.update(zip(chunk["sentences"], chunk["labels"]))
+                pcts = chunk["percentages"]
+                progress_bar.progress(chunk["done"] / chunk["total"])
+                partial_results.caption(
+                    f"Classified {chunk['done']} of {chunk['total']} sentences • "
+                    + " • ".join(f"{cat}: {pct:.1f}%" for cat, pct in pcts.items()))
+            st.session_state["classification_map"] = c_map
+            st.session_state["percentages"] = pcts
 
             with st.spinner("🎨 Generating annotated PDF..."):
                 annotated = generate_annotated_pdf(
@@ -189,6 +198,13 @@ def show_pdf_detection_page():
             st.markdown("#### 📋 Detailed Breakdown")
             st.table(df.set_index("Category").style.format(
                 {"Percentage": "{:.1f}%"}))
+
+            cache_stats = detection_cache_stats()
+            st.caption(
+                f"Detection cache: {cache_stats['lookups'] - cache_stats['misses']} hits "
+                f"({cache_stats['memory_hits']} memory, {cache_stats['disk_hits']} disk, "
+                f"{cache_stats['duplicate_hits']} repeated), "
+                f"{cache_stats['misses']} misses • hit rate {cache_stats['hit_rate']*100:.1f}%")
         
         if st.session_state["annotated_pdf"]:
             st.subheader("📥 Download Your Annotated PDF")
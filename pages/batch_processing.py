@@ -6,8 +6,9 @@ import pandas as pd
 import altair as alt
 import zipfile
 from io import BytesIO
-from utils.pdf_utils import extract_text_from_pdf, word_count
-from utils.ai_detection_utils import classify_text_hf
+from utils.pdf_utils import extract_text_from_pdf
+from utils.document_stats import document_stats
+from utils.ai_detection_utils import classify_text_hf, classify_text_sampled
 
 def show_batch_processing_page():
     # Navigation buttons
@@ -43,6 +44,11 @@ def show_batch_processing_page():
         
         batch_size = st.slider("Batch Size:", min_value=1, max_value=10, value=3)
         include_detailed = st.checkbox("Include Detailed Analysis", value=False)
+        fast_triage = st.checkbox(
+            "Fast Triage (sampled estimate)", value=False,
+            help="Classify a stratified sample of sentences until the AI/Human percentages "
+                 "are known to within a few points, instead of scoring every sentence."
+        )
         export_format = st.selectbox(
             "Export Format:",
             ["CSV", "Excel", "JSON"]
@@ -67,17 +73,26 @@ def show_batch_processing_page():
                                 text = uploaded_file.read().decode('utf-8')
                             
                             # Analyze
-                            result = classify_text_hf(text)
+                            if fast_triage:
+                                sampled = classify_text_sampled(text)
+                                result = sampled.summary()
+                                low, high = sampled.intervals["AI-generated"]
+                                coverage = (f"{sampled.sample_size}/{sampled.total_sentences} sentences, "
+                                            f"AI {low:.1f}-{high:.1f}% @ {sampled.confidence:.0%}")
+                            else:
+                                result = classify_text_hf(text).summary()
+                                coverage = "All sentences"
                             
                             batch_results.append({
                                 'File Name': uploaded_file.name,
                                 'File Type': uploaded_file.type.split('/')[-1].upper(),
-                                'Words': word_count(text),
+                                'Words': document_stats(text).words,
                                 'Characters': len(text),
                                 'Human %': f"{result.get('human_prob', 0)*100:.1f}",
                                 'AI %': f"{result.get('ai_prob', 0)*100:.1f}",
                                 'Mixed %': f"{result.get('mixed_prob', 0)*100:.1f}",
                                 'Classification': result.get('label', 'Unknown'),
+                                'Coverage': coverage,
                                 'Processing Status': '✓ Success'
                             })
                         
@@ -91,6 +106,7 @@ def show_batch_processing_page():
                                 'AI %': 0,
                                 'Mixed %': 0,
                                 'Classification': 'Error',
+                                'Coverage': '-',
                                 'Processing Status': f'✗ Error: {str(e)[:50]}'
                             })
                         
@@ -5,7 +5,7 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 from utils.ai_detection_utils import classify_text_hf
-from utils.pdf_utils import word_count
+from utils.document_stats import document_stats
 from difflib import SequenceMatcher
 
 def show_document_comparison_page():
@@ -93,11 +93,12 @@ def show_document_comparison_page():
                     analysis_results = {}
                     
                     for doc_name, content in filled_docs.items():
-                        result = classify_text_hf(content)
+                        result = classify_text_hf(content).summary()
+                        stats = document_stats(content)
                         analysis_results[doc_name] = {
                             'content': content,
-                            'word_count': word_count(content),
-                            'sentence_count': len([s for s in content.split('.') if s.strip()]),
+                            'word_count': stats.words,
+                            'sentence_count': stats.sentences,
                             'human_prob': result.get('human_prob', 0),
                             'ai_prob': result.get('ai_prob', 0),
                             'mixed_prob': result.get('mixed_prob', 0),
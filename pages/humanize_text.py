@@ -1,12 +1,26 @@
+import hashlib
+import os
 import random
 import re
 import ssl
 import warnings
 import nltk
-import spacy
 import streamlit as st
-from nltk.corpus import wordnet
-from nltk.tokenize import sent_tokenize, word_tokenize
+from utils.lru import LRUCache
+from utils.document_stats import comparison_mode, document_stats
+from utils.humanize_pipeline import (
+    HUMANIZE_STAGES,
+    PIPELINE_VERSION,
+    SPACY_BATCH_SIZE,
+    SPACY_N_PROCESS,
+    humanize_paragraphs,
+    load_nlp,
+    minimal_rewriting,
+    resolve_stages,
+    rewrite_paragraphs,
+    rewrite_paragraphs_parallel,
+)
+from utils.stage_timings import measure
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -28,263 +42,336 @@ def download_nltk_resources():
 
 download_nltk_resources()
 
+# Process-pool size for paragraph-parallel rewriting (1 = in-process).
+HUMANIZE_WORKERS = int(os.environ.get("HUMANIZE_WORKERS", "1"))
+# Budget for cached humanized outputs, in characters of output text.
+HUMANIZE_CACHE_CHARS = int(os.environ.get("HUMANIZE_CACHE_CHARS", str(8_000_000)))
+# Streaming rewrites process paragraphs in chunks of about this many characters.
+HUMANIZE_STREAM_CHUNK_CHARS = int(os.environ.get("HUMANIZE_STREAM_CHUNK_CHARS", "16000"))
+
 ########################################
 # Prepare spaCy pipeline
 ########################################
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
+# The rewriting core lives in utils.humanize_pipeline so pool workers can
+# import it without this page; the model is loaded there once per process.
+nlp = load_nlp()
+if nlp is None:
     st.warning("spaCy en_core_web_sm model not found. Install with: python -m spacy download en_core_web_sm")
-    nlp = None
 
 ########################################
-# Citation Regex
+# Line-preserving rewriting
 ########################################
-CITATION_REGEX = re.compile(
-    r"\(\s*[A-Za-z&\-,\.\s]+(?:et al\.\s*)?,\s*\d{4}(?:,\s*(?:pp?\.\s*\d+(?:-\d+)?))?\s*\)"
-)
+def preserve_linebreaks_rewrite(text, p_syn=0.2, p_trans=0.2,
+                                batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS,
+                                seed=None, workers=None, stages=None, timings=None):
+    """Rewrite text while preserving original line breaks.
 
-########################################
-# Helper: Word & Sentence Counts
-########################################
-def count_words(text):
-    return len(word_tokenize(text))
+    Splits the input on newline characters and rewrites each non-empty line
+    independently, keeping blank lines and original line structure. The
+    sentences of all lines are parsed together in one batched spaCy pass.
+
+    With a `seed` (or `workers` > 1) each non-empty line is a paragraph with
+    its own RNG seeded from (seed, line index), and `workers` > 1 spreads
+    paragraphs over a process pool; the result is the same for any worker
+    count. Without either, the global `random` module is used as before.
+    `stages` and `timings` are passed on to humanize_paragraphs.
+    """
+    lines = text.splitlines()
+    if seed is not None or (workers or 1) > 1:
+        if seed is None:
+            seed = random.getrandbits(64)
+        paragraphs = [(i, ln) for i, ln in enumerate(lines) if ln.strip()]
+        if (workers or 1) > 1:
+            rewritten = rewrite_paragraphs_parallel(paragraphs, p_syn=p_syn, p_trans=p_trans,
+                                                    seed=seed, workers=workers,
+                                                    stages=stages, timings=timings)
+        else:
+            rewritten = rewrite_paragraphs(paragraphs, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                           batch_size=batch_size, n_process=n_process,
+                                           stages=stages, timings=timings)
+        out_lines = [""] * len(lines)
+        for (i, _), paragraph in zip(paragraphs, rewritten):
+            out_lines[i] = paragraph
+        return "\n".join(out_lines)
+
+    rewritten = iter(humanize_paragraphs(
+        [ln for ln in lines if ln.strip()],
+        p_syn=p_syn, p_trans=p_trans, batch_size=batch_size, n_process=n_process,
+        stages=stages, timings=timings,
+    ))
+    out_lines = [next(rewritten) if ln.strip() else "" for ln in lines]
+    # Rejoin using single newline to preserve original paragraph/line breaks
+    return "\n".join(out_lines)
 
-def count_sentences(text):
-    return len(sent_tokenize(text))
 
 ########################################
-# Step 1: Extract & Restore Citations
+# Step 4: Full pipeline with result cache
 ########################################
-def extract_citations(text):
-    refs = CITATION_REGEX.findall(text)
-    placeholder_map = {}
-    replaced_text = text
-    for i, r in enumerate(refs, start=1):
-        placeholder = f"[[REF_{i}]]"
-        placeholder_map[placeholder] = r
-        replaced_text = replaced_text.replace(r, placeholder, 1)
-    return replaced_text, placeholder_map
+humanize_cache = LRUCache(maxsize=HUMANIZE_CACHE_CHARS, sizeof=len)
 
-PLACEHOLDER_REGEX = re.compile(r"\[\s*\[\s*REF_(\d+)\s*\]\s*\]")
 
+def humanize_cache_key(text, p_syn, p_trans, preserve_linebreaks, seed, stages=HUMANIZE_STAGES):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return (digest, float(p_syn), float(p_trans), bool(preserve_linebreaks), seed,
+            tuple(stages), PIPELINE_VERSION)
 
-def restore_citations(text, placeholder_map):
 
-    def replace_placeholder(match):
-        # match.group(1) contains the numeric index captured from the placeholder
-        idx = match.group(1)
-        key = f"[[REF_{idx}]]"
-        return placeholder_map.get(key, match.group(0))
+def humanize_document(text, p_syn=0.2, p_trans=0.2, preserve_linebreaks=True, seed=None,
+                      workers=HUMANIZE_WORKERS, stages=None, timings=None, on_item=None):
+    """
+    Rewrite `text` with citations kept out of the NLP stages, then normalize spacing.
+
+    Every random choice comes from an RNG derived from `seed`, so the same
+    inputs and seed always give the same text. Seeded results are cached
+    (see humanize_cache); without a seed a fresh one is drawn and the result
+    is not cached. `stages` selects and orders the pipeline stages
+    (resolve_stages) and `timings`, a StageTimings, collects per-stage time
+    and allocations. With `preserve_linebreaks`, `on_item` is called with each
+    {"index", "text"} item from humanize_stream as it arrives (not on a cache
+    hit). Returns {"text", "seed", "cached"}.
+    """
+    stages = resolve_stages(stages)
+    key = None
+    if seed is not None:
+        key = humanize_cache_key(text, p_syn, p_trans, preserve_linebreaks, seed, stages)
+        with measure(timings, "cache"):
+            cached = humanize_cache.get(key)
+        if cached is not None:
+            return {"text": cached, "seed": seed, "cached": True}
+    else:
+        seed = random.SystemRandom().getrandbits(63)
+
+    if preserve_linebreaks:
+        parts = []
+        for item in humanize_stream(text, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                    workers=workers, stages=stages, timings=timings):
+            if on_item is not None:
+                on_item(item)
+            parts.append(item["text"])
+        final_text = "\n".join(parts)
+    else:
+        final_text = minimal_rewriting(text, p_syn=p_syn, p_trans=p_trans,
+                                       rng=random.Random(f"{seed}"), stages=stages, timings=timings)
 
-    restored = PLACEHOLDER_REGEX.sub(replace_placeholder, text)
-    return restored
+    if key is not None:
+        humanize_cache.put(key, final_text)
+    return {"text": final_text, "seed": seed, "cached": False}
 
 
-########################################
-# Step 2: Expansions, Synonyms, & Transitions
-########################################
-# Map common full-token contractions to their expansions. Use exact-token
-# matching first to avoid splitting tokens like "can't" -> "ca not".
-# Whole-word contraction map (preferred replacements)
-WHOLE_CONTRACTIONS = {
-    "can't": "cannot",
-    "won't": "will not",
-    "shan't": "shall not",
-    "ain't": "is not",
-    "i'm": "i am",
-    "it's": "it is",
-    "we're": "we are",
-    "they're": "they are",
-    "you're": "you are",
-    "he's": "he is",
-    "she's": "she is",
-    "that's": "that is",
-    "there's": "there is",
-    "what's": "what is",
-    "who's": "who is",
-    "let's": "let us",
-    "didn't": "did not",
-    "doesn't": "does not",
-    "don't": "do not",
-    "couldn't": "could not",
-    "shouldn't": "should not",
-    "wouldn't": "would not",
-    "isn't": "is not",
-    "aren't": "are not",
-    "weren't": "were not",
-    "hasn't": "has not",
-    "haven't": "have not",
-    "hadn't": "had not",
-}
-
-# Suffix-based fallback contractions (used only if whole-word replacement didn't match)
-SUFFIX_CONTRACTIONS = {
-    "n't": " not",
-    "'re": " are",
-    "'s": " is",
-    "'ll": " will",
-    "'ve": " have",
-    "'d": " would",
-    "'m": " am"
-}
-
-ACADEMIC_TRANSITIONS = [
-    "Moreover,",
-    "Additionally,",
-    "Furthermore,",
-    "Hence,",
-    "Therefore,",
-    "Consequently,",
-    "Nonetheless,",
-    "Nevertheless,",
-    "In contrast,",
-    "On the other hand,",
-    "In addition,",
-    "As a result,",
-]
-
-def expand_contractions(sentence):
-    # 1) Apply whole-word contractions using regex on the raw sentence to
-    #    avoid tokenizers splitting contractions (e.g., "can't" -> "ca n't").
-    def _replace_whole(match):
-        orig = match.group(0)
-        key = orig.lower()
-        repl = WHOLE_CONTRACTIONS.get(key, orig)
-        # preserve capitalization of the first character
-        if orig and orig[0].isupper():
-            repl = repl.capitalize()
-        return repl
-
-    # Build a regex alternation for whole contractions and allow optional
-    # tokenized opening/closing quotes (`` and ''). This ensures we match
-    # contractions even when they appear as `` can't '' after tokenization.
-    alt = "|".join(re.escape(k) for k in WHOLE_CONTRACTIONS.keys())
-    whole_pattern = rf"(?:(``)\s*)?(?P<word>(?:{alt}))(?:\s*(''))?"
-
-    def _replace_whole_with_quotes(match):
-        open_tok = match.group(1) or ""
-        word = match.group('word')
-        close_tok = match.group(3) or ""
-        key = word.lower()
-        repl = WHOLE_CONTRACTIONS.get(key, word)
-        if word and word[0].isupper():
-            repl = repl.capitalize()
-        return f"{open_tok}{repl}{close_tok}"
-
-    sentence = re.sub(whole_pattern, _replace_whole_with_quotes,
-                      sentence, flags=re.IGNORECASE)
-
-    # 2) Tokenize and handle suffix-based contractions as a fallback
-    tokens = word_tokenize(sentence)
-    out_tokens = []
-    for t in tokens:
-        lower_t = t.lower()
-        replaced = False
-        for contr, expansion in SUFFIX_CONTRACTIONS.items():
-            if lower_t.endswith(contr):
-                base = lower_t[: -len(contr)]
-                new_t = base + expansion
-                if t and t[0].isupper():
-                    new_t = new_t.capitalize()
-                out_tokens.append(new_t)
-                replaced = True
-                break
-        if not replaced:
-            out_tokens.append(t)
-    return " ".join(out_tokens)
-
-def replace_synonyms(sentence, p_syn=0.2):
-    if not nlp:
-        return sentence
-
-    doc = nlp(sentence)
-    new_tokens = []
-    for token in doc:
-        if "[[REF_" in token.text:
-            new_tokens.append(token.text)
-            continue
-        if token.pos_ in ["ADJ", "NOUN", "VERB", "ADV"] and wordnet.synsets(token.text):
-            if random.random() < p_syn:
-                synonyms = get_synonyms(token.text, token.pos_)
-                if synonyms:
-                    new_tokens.append(random.choice(synonyms))
-                else:
-                    new_tokens.append(token.text)
+# The line boundaries str.splitlines recognises.
+LINE_BREAK = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def iter_lines(text):
+    """Yield the lines of `text` exactly as str.splitlines would, without copying it all."""
+    start = 0
+    for match in LINE_BREAK.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
+def _flush_chunk(chunk, blanks, p_syn, p_trans, seed, workers, stages, timings):
+    """Rewrite one chunk of (index, paragraph) pairs and yield it with its blank lines."""
+    rewritten = rewrite_paragraphs_parallel(chunk, p_syn=p_syn, p_trans=p_trans,
+                                            seed=seed, workers=workers,
+                                            stages=stages, timings=timings)
+    outputs = {i: out for (i, _), out in zip(chunk, rewritten)}
+    for index in sorted(list(outputs) + blanks):
+        yield {"index": index, "text": outputs.get(index, "")}
+
+
+def humanize_stream(lines, p_syn=0.2, p_trans=0.2, seed=None, workers=HUMANIZE_WORKERS,
+                    chunk_chars=HUMANIZE_STREAM_CHUNK_CHARS, stages=None, timings=None):
+    """
+    Generator form of the line-preserving humanizer. `lines` is a string or
+    any iterable of lines (e.g. an open file). Paragraphs (non-empty lines)
+    are rewritten in chunks of about `chunk_chars`
+    characters, and {"index", "text"} items are yielded in line order as soon
+    as their chunk is done; blank lines come back as "". Only one chunk is
+    held at a time, so memory does not grow with the input.
+
+    Paragraph i uses paragraph_rng(seed, i), so joining the yielded texts with
+    "\\n" gives the same result for any chunk size or worker count.
+    `stages` and `timings` work as in humanize_document.
+    """
+    stages = resolve_stages(stages)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    if isinstance(lines, str):
+        lines = iter_lines(lines)
+    else:
+        # Files only break on \n and \r; split the rest as str.splitlines does.
+        lines = (part for line in lines for part in (line.splitlines() or [""]))
+
+    chunk = []
+    blanks = []
+    size = 0
+    for index, line in enumerate(lines):
+        if not line.strip():
+            if chunk:
+                blanks.append(index)
             else:
-                new_tokens.append(token.text)
-        else:
-            new_tokens.append(token.text)
-    return " ".join(new_tokens)
-
-
-def add_academic_transition(sentence, p_transition=0.2):
-    if random.random() < p_transition:
-        transition = random.choice(ACADEMIC_TRANSITIONS)
-        return f"{transition} {sentence}"
-    return sentence
-
-
-def get_synonyms(word, pos):
-    wn_pos = None
-    if pos.startswith("ADJ"):
-        wn_pos = wordnet.ADJ
-    elif pos.startswith("NOUN"):
-        wn_pos = wordnet.NOUN
-    elif pos.startswith("ADV"):
-        wn_pos = wordnet.ADV
-    elif pos.startswith("VERB"):
-        wn_pos = wordnet.VERB
-
-    synonyms = set()
-    if wn_pos:
-        for syn in wordnet.synsets(word, pos=wn_pos):
-            for lemma in syn.lemmas():
-                lemma_name = lemma.name().replace("_", " ")
-                if lemma_name.lower() != word.lower():
-                    synonyms.add(lemma_name)
-    return list(synonyms)
+                yield {"index": index, "text": ""}
+            continue
+        chunk.append((index, line))
+        size += len(line)
+        if size >= chunk_chars:
+            yield from _flush_chunk(chunk, blanks, p_syn, p_trans, seed, workers, stages, timings)
+            chunk, blanks, size = [], [], 0
+    if chunk:
+        yield from _flush_chunk(chunk, blanks, p_syn, p_trans, seed, workers, stages, timings)
+
+
+def humanize_cache_stats():
+    """Entries, size (characters), hits, misses, evictions and hit rate of the result cache."""
+    return humanize_cache.stats()
 
 
 ########################################
-# Step 3: Minimal "Humanize" line-by-line
+# Step 5: Incremental re-humanization
 ########################################
-def minimal_humanize_line(line, p_syn=0.2, p_trans=0.2):
-    line = expand_contractions(line)
-    line = replace_synonyms(line, p_syn=p_syn)
-    line = add_academic_transition(line, p_transition=p_trans)
-    return line
-
+def paragraph_fingerprint(paragraph, p_syn, p_trans, seed, stages=HUMANIZE_STAGES):
+    """Key of a paragraph's rewrite: its text plus everything that affects the output."""
+    payload = (f"{PIPELINE_VERSION}\0{seed}\0{float(p_syn)}\0{float(p_trans)}\0"
+               f"{','.join(stages)}\0{paragraph}")
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-def minimal_rewriting(text, p_syn=0.2, p_trans=0.2):
-    lines = sent_tokenize(text)
-    out_lines = [
-        minimal_humanize_line(ln, p_syn=p_syn, p_trans=p_trans) for ln in lines
-    ]
-    return " ".join(out_lines)
 
+def humanize_incremental(text, p_syn=0.2, p_trans=0.2, seed=0, previous=None,
+                         workers=HUMANIZE_WORKERS, stages=None, timings=None):
+    """
+    Humanize `text` paragraph by paragraph (one non-empty line each), reusing
+    outputs from `previous` ({fingerprint: output}, as returned by the last
+    call) for paragraphs whose text and settings are unchanged.
+
+    Each paragraph is processed on its own: its RNG is seeded from
+    (seed, fingerprint) instead of its position, so inserting or editing one
+    paragraph never changes the output of the others. Only new or edited
+    paragraphs are rewritten.
+
+    Returns (final_text, memo, stats); `memo` covers just this document's
+    paragraphs and should be passed back as `previous` next time. `stages`
+    and `timings` work as in humanize_document.
+    """
+    for item in humanize_incremental_stream(text, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                            previous=previous, workers=workers,
+                                            stages=stages, timings=timings):
+        pass
+    return item["text"], item["memo"], item["stats"]
 
-def preserve_linebreaks_rewrite(text, p_syn=0.2, p_trans=0.2):
-    """Rewrite text while preserving original line breaks.
 
-    Splits the input on newline characters and rewrites each non-empty line
-    independently, keeping blank lines and original line structure.
+def humanize_incremental_stream(text, p_syn=0.2, p_trans=0.2, seed=0, previous=None,
+                                workers=HUMANIZE_WORKERS, chunk_chars=HUMANIZE_STREAM_CHUNK_CHARS,
+                                stages=None, timings=None):
+    """
+    Generator form of humanize_incremental. New or edited paragraphs are
+    rewritten in chunks of about `chunk_chars` characters, and a dict is
+    yielded after each chunk:
+        {"paragraphs": <this chunk's outputs>, "done": <paragraphs rewritten
+         so far>, "total": <paragraphs to rewrite>}
+    The last item also carries "text", "memo" and "stats" as returned by
+    humanize_incremental; with nothing to rewrite it is the only item.
     """
+    stages = resolve_stages(stages)
+    previous = previous or {}
     lines = text.splitlines()
-    out_lines = []
-    for ln in lines:
-        if not ln.strip():
-            out_lines.append("")
+    fingerprints = [paragraph_fingerprint(ln, p_syn, p_trans, seed, stages) if ln.strip() else None
+                    for ln in lines]
+
+    memo = {}
+    pending = {}
+    for ln, fp in zip(lines, fingerprints):
+        if fp is None or fp in memo or fp in pending:
+            continue
+        if fp in previous:
+            memo[fp] = previous[fp]
         else:
-            out_lines.append(minimal_rewriting(
-                ln, p_syn=p_syn, p_trans=p_trans))
-    # Rejoin using single newline to preserve original paragraph/line breaks
-    return "\n".join(out_lines)
+            pending[fp] = ln
+
+    # Each paragraph's RNG depends only on its fingerprint, so chunking
+    # does not change the output.
+    chunks = [[]]
+    size = 0
+    for fp, ln in pending.items():
+        if size >= chunk_chars:
+            chunks.append([])
+            size = 0
+        chunks[-1].append((fp, ln))
+        size += len(ln)
+
+    done = 0
+    for n, todo in enumerate(chunks, 1):
+        rewritten = []
+        if todo:
+            rewritten = rewrite_paragraphs_parallel(todo, p_syn=p_syn, p_trans=p_trans,
+                                                    seed=seed, workers=workers,
+                                                    stages=stages, timings=timings)
+            for (fp, _), out in zip(todo, rewritten):
+                memo[fp] = out
+            done += len(todo)
+        item = {"paragraphs": rewritten, "done": done, "total": len(pending)}
+        if n == len(chunks):
+            item["text"] = "\n".join(memo[fp] if fp else "" for fp in fingerprints)
+            item["memo"] = memo
+            item["stats"] = {
+                "paragraphs": sum(1 for fp in fingerprints if fp),
+                "rewritten": len(pending),
+                "reused": sum(1 for fp in fingerprints if fp and fp not in pending),
+            }
+        yield item
 
 
 ########################################
 # Final: Show Humanize Page
 ########################################
+def humanize_progressively(text, p_syn, p_trans, seed, stages=None):
+    """
+    Line-preserving humanize_document for the page: a cached result comes
+    back at once, otherwise the rewrite streams into a live preview and
+    progress bar. Returns the same {"text", "seed", "cached"} dict.
+    """
+    total_lines = max(1, sum(1 for _ in iter_lines(text)))
+    progress = st.progress(0.0, text="Humanizing...")
+    preview = st.empty()
+    parts = []
+
+    def show(item):
+        parts.append(item["text"])
+        if item["text"]:
+            progress.progress(min(1.0, len(parts) / total_lines),
+                              text=f"Humanized {len(parts)} of {total_lines} lines")
+            preview.text("\n".join(parts[-40:]))
+
+    result = humanize_document(text, p_syn=p_syn, p_trans=p_trans, preserve_linebreaks=True,
+                               seed=seed, stages=stages, on_item=show)
+    progress.empty()
+    preview.empty()
+    return result
+
+
+def rehumanize_progressively(text, p_syn, p_trans, seed, previous, stages=None):
+    """
+    Incremental humanization for the page: only new or edited paragraphs are
+    rewritten, with a live preview and progress bar while they stream in.
+    Returns (final_text, memo, stats) like humanize_incremental.
+    """
+    progress = st.progress(0.0, text="Humanizing...")
+    preview = st.empty()
+    recent = []
+    for item in humanize_incremental_stream(text, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                            previous=previous, stages=stages):
+        if item["paragraphs"]:
+            progress.progress(item["done"] / item["total"],
+                              text=f"Re-humanized {item['done']} of {item['total']} edited paragraphs")
+            recent = (recent + item["paragraphs"])[-40:]
+            preview.text("\n".join(recent))
+    progress.empty()
+    preview.empty()
+    return item["text"], item["memo"], item["stats"]
+
+
 def show_humanize_page():
     # Navigation buttons
     col1, col2 = st.columns([1, 1])
@@ -371,6 +458,33 @@ def show_humanize_page():
             help="Higher values add more transitional phrases for better flow"
         )
 
+    seed_text = st.text_input(
+        "**Seed (optional)**",
+        value="",
+        help="Use the same seed with the same mode to get the same result again (incremental and "
+             "full runs derive different text from one seed); leave empty for a fresh variation "
+             "on each click"
+    ).strip()
+    if seed_text and not seed_text.lstrip("-").isdigit():
+        st.warning("Seed must be a whole number; ignoring it.")
+        seed_text = ""
+    seed = int(seed_text) if seed_text else None
+
+    incremental = st.checkbox(
+        "**Incremental mode**",
+        value=True,
+        help="Only re-humanize paragraphs you edited since the last run; unchanged paragraphs keep "
+             "their previous output. Resubmitting unchanged text without a seed gives a fresh variation"
+    )
+
+    selected_stages = st.multiselect(
+        "**Pipeline stages**",
+        HUMANIZE_STAGES,
+        default=list(HUMANIZE_STAGES),
+        help="Turn off stages you don't need; they always run in the order listed here"
+    )
+    stages = [name for name in HUMANIZE_STAGES if name in selected_stages]
+
     st.subheader("📝 Enter Your Text to Humanize")
     
     input_text = st.text_area(
@@ -385,44 +499,60 @@ def show_humanize_page():
             st.warning("📝 Please enter some text to humanize first.")
             return
 
-        # Show original stats
-        orig_wc = count_words(input_text)
-        orig_sc = count_sentences(input_text)
-        
+        with st.spinner("✍️ Protecting citations and enhancing writing style..."):
+            if incremental:
+                # Without an explicit seed, keep the session's seed while the
+                # text is being edited so unchanged paragraphs stay stable;
+                # resubmitting the same text draws a fresh variation.
+                if seed is None:
+                    if ("humanize_seed" not in st.session_state
+                            or "humanize_memo" not in st.session_state
+                            or st.session_state.get("humanize_input") == input_text):
+                        st.session_state["humanize_seed"] = random.SystemRandom().getrandbits(63)
+                        st.session_state.pop("humanize_memo", None)
+                    seed = st.session_state["humanize_seed"]
+                final_text, memo, inc_stats = rehumanize_progressively(
+                    input_text, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                    previous=st.session_state.get("humanize_memo"), stages=stages,
+                )
+                st.session_state["humanize_memo"] = memo
+                st.session_state["humanize_input"] = input_text
+                result = {"seed": seed}
+            else:
+                inc_stats = None
+                result = humanize_progressively(input_text, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                                stages=stages)
+                final_text = result["text"]
+
+        # Count both texts in one mode so the added words/sentences are comparable
+        mode = comparison_mode(input_text, final_text)
+        orig_stats = document_stats(input_text, mode)
+        orig_wc = orig_stats.words
+        orig_sc = orig_stats.sentences
+
         col1, col2 = st.columns(2)
         with col1:
             st.metric("Original Word Count", orig_wc)
         with col2:
             st.metric("Original Sentence Count", orig_sc)
 
-        with st.spinner("🔍 Analyzing text and protecting citations..."):
-            # Extract and protect citations
-            no_refs_text, placeholders = extract_citations(input_text)
-            
-        with st.spinner("✍️ Enhancing writing style and flow..."):
-            # Apply humanization while preserving line breaks
-            partially_rewritten = preserve_linebreaks_rewrite(
-                no_refs_text, p_syn=p_syn, p_trans=p_trans
-            )
-            
-        with st.spinner("✅ Restoring citations and finalizing..."):
-            # Restore citations
-            final_text = restore_citations(partially_rewritten, placeholders)
-
-            # Normalize spaces around punctuation but do not remove newlines
-            final_text = re.sub(r"[ \t]+([.,;:!?])", r"\1", final_text)
-            final_text = re.sub(r"(\()[ \t]+", r"\1", final_text)
-            final_text = re.sub(r"[ \t]+(\))", r"\1", final_text)
-            # Collapse multiple spaces/tabs (but keep newlines)
-            final_text = re.sub(r"[ \t]{2,}", " ", final_text)
-            # Normalize paired tokenized quotes: `` ... '' -> "..." (remove stray spaces)
-            final_text = re.sub(r"``\s*(.+?)\s*''", r'"\1"', final_text)
-
-        # Calculate new stats
-        new_wc = count_words(final_text)
-        new_sc = count_sentences(final_text)
+        new_stats = document_stats(final_text, mode)
+        new_wc = new_stats.words
+        new_sc = new_stats.sentences
 
         st.subheader("🎉 Your Humanized Text")
+        if inc_stats is not None:
+            st.caption(
+                f"Seed {result['seed']} (reproduces incremental runs only) · "
+                f"re-humanized {inc_stats['rewritten']} of "
+                f"{inc_stats['paragraphs']} paragraphs, reused {inc_stats['reused']}"
+            )
+        else:
+            cache = humanize_cache_stats()
+            st.caption(
+                f"Seed {result['seed']}{' (cached result)' if result['cached'] else ''} · "
+                f"result cache hit rate {cache['hit_rate']:.0%} over {cache['hits'] + cache['misses']} lookups"
+            )
 
         st.success(f"✅ Successfully enhanced your text! Added **{new_wc - orig_wc} words** and **{new_sc - orig_sc} sentences** for better flow.")
 
@@ -4,8 +4,8 @@ Direct text input analysis page for AI detection and analysis
 import streamlit as st
 import pandas as pd
 import altair as alt
-from utils.ai_detection_utils import classify_text_hf
-from utils.pdf_utils import word_count
+from utils.ai_detection_utils import classify_text_hf_stream
+from utils.document_stats import document_stats
 
 def show_text_analysis_page():
     # Navigation buttons
@@ -36,8 +36,9 @@ def show_text_analysis_page():
         )
     
     with col2:
-        st.metric("Word Count", word_count(user_text) if user_text else 0)
-        st.metric("Sentence Count", len([s for s in user_text.split('.') if s.strip()]) if user_text else 0)
+        stats = document_stats(user_text or "")
+        st.metric("Word Count", stats.words)
+        st.metric("Sentence Count", stats.sentences)
 
     # Analysis options
     st.markdown("### Analysis Options")
@@ -63,108 +64,87 @@ def show_text_analysis_page():
         if not user_text.strip():
             st.error("Please enter some text to analyze.")
         else:
-            with st.spinner("Analyzing text..."):
-                try:
-                    # Classify the entire text
-                    result = classify_text_hf(user_text)
-                    
-                    # Display overall results
-                    st.markdown("### 📊 Overall Detection Results")
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        human_prob = result.get('human_prob', 0)
-                        st.metric("Human Probability", f"{human_prob*100:.1f}%")
-                    
-                    with col2:
-                        ai_prob = result.get('ai_prob', 0)
-                        st.metric("AI Probability", f"{ai_prob*100:.1f}%")
-                    
-                    with col3:
-                        mixed_prob = result.get('mixed_prob', 0)
-                        st.metric("Mixed Probability", f"{mixed_prob*100:.1f}%")
-                    
-                    with col4:
-                        label = result.get('label', 'Unknown')
-                        st.metric("Classification", label)
-                    
-                    # Visualization
+            try:
+                st.markdown("### 📊 Overall Detection Results")
+                progress_bar = st.progress(0)
+                metrics_placeholder = st.empty()
+                chart_placeholder = st.empty()
+
+                results_data = []
+                for chunk in classify_text_hf_stream(user_text):
+                    percentages = chunk["percentages"]
+                    progress_bar.progress(chunk["done"] / chunk["total"])
+
+                    # Re-render running metrics as each batch of sentences finishes
+                    with metrics_placeholder.container():
+                        cols = st.columns(4)
+                        for col, (category, pct) in zip(cols, percentages.items()):
+                            with col:
+                                st.metric(category, f"{pct:.1f}%")
+                        st.caption(f"Classified {chunk['done']} of {chunk['total']} sentences")
+
                     if show_visualization:
-                        st.markdown("### 📈 Probability Distribution")
-                        
                         chart_data = pd.DataFrame({
-                            'Category': ['Human', 'AI', 'Mixed'],
-                            'Probability': [
-                                human_prob * 100,
-                                ai_prob * 100,
-                                mixed_prob * 100
-                            ]
+                            'Category': list(percentages.keys()),
+                            'Percentage': list(percentages.values())
                         })
-                        
                         chart = alt.Chart(chart_data).mark_bar().encode(
                             x=alt.X('Category:N', title='Content Type'),
-                            y=alt.Y('Probability:Q', title='Probability (%)', scale=alt.Scale(domain=[0, 100])),
+                            y=alt.Y('Percentage:Q', title='Percentage (%)', scale=alt.Scale(domain=[0, 100])),
                             color=alt.Color('Category:N', scale=alt.Scale(
-                                domain=['Human', 'AI', 'Mixed'],
-                                range=['#00CC96', '#FF6B6B', '#FFB366']
+                                domain=["AI-generated", "AI-generated & AI-refined", "Human-written", "Human-written & AI-refined"],
+                                range=["#ff6666", "#ff9900", "#66CC99", "#6699FF"]
                             )),
-                            tooltip=['Category', 'Probability']
+                            tooltip=['Category', 'Percentage']
                         ).properties(
                             height=400,
                             width=600
                         )
-                        
-                        st.altair_chart(chart, use_container_width=True)
-                    
-                    # Sentence-level analysis
-                    if show_sentence_level:
-                        st.markdown("### 🔬 Sentence-Level Analysis")
-                        
-                        sentences = [s.strip() for s in user_text.split('.') if s.strip()]
-                        
-                        if sentences:
-                            results_data = []
-                            
-                            for idx, sentence in enumerate(sentences, 1):
-                                sentence_result = classify_text_hf(sentence)
-                                results_data.append({
-                                    'Sentence #': idx,
-                                    'Text': sentence[:100] + "..." if len(sentence) > 100 else sentence,
-                                    'Classification': sentence_result.get('label', 'Unknown'),
-                                    'Confidence': f"{max(sentence_result.get('human_prob', 0), sentence_result.get('ai_prob', 0), sentence_result.get('mixed_prob', 0))*100:.1f}%"
-                                })
-                            
-                            results_df = pd.DataFrame(results_data)
-                            
-                            # Color code the results
-                            def color_classification(val):
-                                if val == 'Human':
-                                    return 'background-color: #90EE90'
-                                elif val == 'AI':
-                                    return 'background-color: #FFB6C6'
-                                else:
-                                    return 'background-color: #FFE4B5'
-                            
-                            st.dataframe(
-                                results_df.style.applymap(color_classification, subset=['Classification']),
-                                use_container_width=True,
-                                height=400
-                            )
-                            
-                            # Download results
-                            csv = results_df.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Download Analysis Results (CSV)",
-                                data=csv,
-                                file_name="text_analysis_results.csv",
-                                mime="text/csv"
-                            )
-                    
-                    st.success("✅ Analysis complete!")
-                
-                except Exception as e:
-                    st.error(f"❌ Error during analysis: {str(e)}")
-                    st.info("Please try with shorter text or a different format.")
+                        chart_placeholder.altair_chart(chart, use_container_width=True)
+
+                    for sentence, label, score in zip(chunk["sentences"], chunk["labels"], chunk["scores"]):
+                        results_data.append({
+                            'Sentence #': len(results_data) + 1,
+                            'Text': sentence[:100] + "..." if len(sentence) > 100 else sentence,
+                            'Classification': label,
+                            'Confidence': f"{score*100:.1f}%"
+                        })
+
+                # Sentence-level analysis
+                if show_sentence_level and results_data:
+                    st.markdown("### 🔬 Sentence-Level Analysis")
+
+                    results_df = pd.DataFrame(results_data)
+
+                    # Color code the results
+                    def color_classification(val):
+                        if val == 'Human-written':
+                            return 'background-color: #90EE90'
+                        elif val == 'AI-generated':
+                            return 'background-color: #FFB6C6'
+                        else:
+                            return 'background-color: #FFE4B5'
+
+                    st.dataframe(
+                        results_df.style.applymap(color_classification, subset=['Classification']),
+                        use_container_width=True,
+                        height=400
+                    )
+
+                    # Download results
+                    csv = results_df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download Analysis Results (CSV)",
+                        data=csv,
+                        file_name="text_analysis_results.csv",
+                        mime="text/csv"
+                    )
+
+                st.success("✅ Analysis complete!")
+
+            except Exception as e:
+                st.error(f"❌ Error during analysis: {str(e)}")
+                st.info("Please try with shorter text or a different format.")
 
     st.markdown("---")
     st.info("""
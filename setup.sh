@@ -11,4 +11,7 @@ python -m nltk.downloader all
 
 
 echo "Downloading NLTK data..."
-python -c "import nltk; nltk.download('punkt_tab', quiet=True); nltk.download('punkt', quiet=True); nltk.download('wordnet', quiet=True); nltk.download('averaged_perceptron_tagger', quiet=True)"
\ No newline at end of file
+python -c "import nltk; nltk.download('punkt_tab', quiet=True); nltk.download('punkt', quiet=True); nltk.download('wordnet', quiet=True); nltk.download('averaged_perceptron_tagger', quiet=True)"
+
+echo "Building WordNet synonym index..."
+python -m utils.synonym_index build
@@ -1,47 +1,227 @@
-import nltk
-from nltk.tokenize import sent_tokenize
-from utils.model_loaders import load_detector_model
+import random
+from statistics import NormalDist
+import numpy as np
+from utils.model_loaders import (
+    load_detector_engine,
+    load_detection_cache,
+    load_sharded_detector,
+    DEFAULT_DETECTOR_BACKEND,
+)
+from utils.detector_engine import DEFAULT_MAX_BATCH_TOKENS, DEFAULT_WINDOW_STRIDE
+from utils.detection_result import CATEGORIES, CATEGORY_CODES, DetectionResult, SampledDetectionResult
+from utils.segmentation import sentence_spans
 
-nltk.download('punkt', quiet=True)
 
-def classify_text_hf(text, threshold=0.8):
-    """
-    Splits text into sentences, uses roberta-base-openai-detector to classify each sentence
-    as AI-generated or human-written, returning a map of {sentence: label} and overall percentages.
-    """
-    detector = load_detector_model()
-    sentences = sent_tokenize(text)
-    results = detector(sentences, truncation=True)
-
-    classification_map = {}
-    counts = {
-        "AI-generated": 0,
-        "AI-generated & AI-refined": 0,
-        "Human-written": 0,
-        "Human-written & AI-refined": 0
-    }
+# Sentences per chunk yielded by classify_text_hf_stream.
+DEFAULT_STREAM_CHUNK = 64
+# Sampling mode: sentences classified per round and number of positional strata.
+DEFAULT_SAMPLE_ROUND = 64
+DEFAULT_SAMPLE_STRATA = 8
+
+
+def _label_for(result, threshold):
+    """Map a raw FAKE/REAL detector result onto the four reporting categories."""
+    label = result['label'].upper()  # "FAKE" or "REAL"
+    score = result['score']
+    if label == "FAKE":
+        return "AI-generated" if score >= threshold else "AI-generated & AI-refined"
+    if label == "REAL":
+        return "Human-written" if score >= threshold else "Human-written & AI-refined"
+    return "Human-written"
 
-    for sentence, result in zip(sentences, results):
-        label = result['label'].upper()  # "FAKE" or "REAL"
-        score = result['score']
-        if label == "FAKE":
-            if score >= threshold:
-                new_label = "AI-generated"
-            else:
-                new_label = "AI-generated & AI-refined"
-        elif label == "REAL":
-            if score >= threshold:
-                new_label = "Human-written"
-            else:
-                new_label = "Human-written & AI-refined"
-        else:
-            new_label = "Human-written"
-        classification_map[sentence] = new_label
-        counts[new_label] += 1
 
+def _percentages(counts):
     total = sum(counts.values())
-    percentages = {
+    return {
         cat: round((count / total)*100, 2) if total > 0 else 0
         for cat, count in counts.items()
     }
-    return classification_map, percentages
+
+
+def _score_sentences(sentences, max_batch_tokens, use_cache, backend, workers=None, torch_threads=None):
+    if workers and workers > 1:
+        detector = load_sharded_detector(workers, torch_threads=torch_threads,
+                                         max_batch_tokens=max_batch_tokens, backend=backend)
+    else:
+        detector = load_detector_engine(max_batch_tokens=max_batch_tokens, backend=backend)
+    if use_cache:
+        return load_detection_cache(backend=backend).resolve(sentences, detector)
+    return detector(sentences)
+
+
+def _segment(text):
+    """Sentences plus their start/end offsets from the shared segmentation pass."""
+    spans = sentence_spans(text)
+    sentences = [text[start:end] for start, end in spans]
+    return sentences, [start for start, _ in spans], [end for _, end in spans]
+
+
+def classify_text_hf(text, threshold=0.8, max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS, use_cache=True,
+                     backend=DEFAULT_DETECTOR_BACKEND, workers=None, torch_threads=None,
+                     window=False, stride=DEFAULT_WINDOW_STRIDE):
+    """
+    Splits text into sentences and uses roberta-base-openai-detector to classify each sentence
+    as AI-generated or human-written. Returns a DetectionResult holding per-sentence character
+    spans, label codes and scores; it unpacks to the legacy `(classification_map, percentages)`.
+
+    Sentences are scored through the length-bucketed batching engine; `max_batch_tokens`
+    bounds the padded size of each forward pass. With `use_cache`, raw scores are looked up
+    in the detection cache first and only unseen sentences reach the model. `backend`
+    selects the inference runtime ("torch", "onnx" or "onnx-int8").
+
+    With `workers` > 1, sentences are split into contiguous shards and scored by a pool of
+    processes that each hold their own detector, using `torch_threads` threads apiece
+    (default: cores divided evenly between workers).
+
+    With `window`, consecutive sentences are packed into model-length windows overlapping by
+    about `stride` tokens; each window is scored once and its score is attributed back to the
+    member sentences by overlap weighting. Window scores depend on context, so they bypass the
+    per-sentence cache.
+    """
+    sentences, starts, ends = _segment(text)
+    if window:
+        detector = load_detector_engine(max_batch_tokens=max_batch_tokens, backend=backend)
+        results = detector.score_windows(text, list(zip(starts, ends)), stride=stride)
+    else:
+        results = _score_sentences(sentences, max_batch_tokens, use_cache, backend, workers, torch_threads)
+    codes = [CATEGORY_CODES[_label_for(r, threshold)] for r in results]
+    scores = [r['score'] for r in results]
+    return DetectionResult(text, starts, ends, codes, scores)
+
+
+def classify_text_hf_stream(text, threshold=0.8, chunk_size=DEFAULT_STREAM_CHUNK,
+                            max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS, use_cache=True,
+                            backend=DEFAULT_DETECTOR_BACKEND):
+    """
+    Streaming variant of classify_text_hf.
+
+    Sentences are classified in document order, `chunk_size` at a time, and a dict is
+    yielded after each chunk:
+        {"sentences": [...], "starts": [...], "ends": [...], "labels": [...], "scores": [...],
+         "done": <sentences classified so far>, "total": <sentence count>,
+         "percentages": <running category percentages>}
+    The first chunk arrives after one batch of work rather than the whole document.
+    """
+    sentences, starts, ends = _segment(text)
+    counts = dict.fromkeys(CATEGORIES, 0)
+    total = len(sentences)
+    for start in range(0, total, chunk_size):
+        chunk = sentences[start:start + chunk_size]
+        results = _score_sentences(chunk, max_batch_tokens, use_cache, backend)
+        labels = [_label_for(r, threshold) for r in results]
+        for label in labels:
+            counts[label] += 1
+        yield {
+            "sentences": chunk,
+            "starts": starts[start:start + len(chunk)],
+            "ends": ends[start:start + len(chunk)],
+            "labels": labels,
+            "scores": [float(r['score']) for r in results],
+            "done": start + len(chunk),
+            "total": total,
+            "percentages": _percentages(counts),
+        }
+
+
+def _allocate_round(pools, taken, n):
+    """Draw about `n` more sentences, keeping every stratum's share proportional to its size."""
+    total = sum(len(pool) for pool in pools)
+    target = sum(taken) + n
+    want = [len(pool) * target / total for pool in pools]
+    alloc = [min(len(pool), max(t, int(w))) for pool, t, w in zip(pools, taken, want)]
+    shortfall = target - sum(alloc)
+    order = sorted(range(len(pools)), key=lambda h: want[h] - alloc[h], reverse=True)
+    while shortfall > 0:
+        grew = False
+        for h in order:
+            if shortfall and alloc[h] < len(pools[h]):
+                alloc[h] += 1
+                shortfall -= 1
+                grew = True
+        if not grew:
+            break
+    batch = []
+    for h, pool in enumerate(pools):
+        batch.extend(pool[taken[h]:alloc[h]])
+        taken[h] = alloc[h]
+    return batch
+
+
+def _stratified_estimate(pools, taken, codes, z):
+    """Stratified point estimate and half-width (as fractions) for every category."""
+    total = sum(len(pool) for pool in pools)
+    estimate = np.zeros(len(CATEGORIES))
+    variance = np.zeros(len(CATEGORIES))
+    for pool, n in zip(pools, taken):
+        size = len(pool)
+        weight = size / total
+        counts = np.bincount([codes[i] for i in pool[:n]], minlength=len(CATEGORIES))
+        estimate += weight * counts / n
+        if n < size:
+            # Shrink towards 1/2 so strata with all-identical labels still report uncertainty.
+            p = (counts + 1) / (n + 2)
+            variance += weight**2 * p * (1 - p) / n * (1 - n / size)
+    return estimate, z * np.sqrt(variance)
+
+
+def classify_text_sampled(text, threshold=0.8, target_width=5.0, confidence=0.95,
+                          round_size=DEFAULT_SAMPLE_ROUND, strata=DEFAULT_SAMPLE_STRATA, seed=0,
+                          max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS, use_cache=True,
+                          backend=DEFAULT_DETECTOR_BACKEND):
+    """
+    Estimate document-level category percentages from a stratified random sample.
+
+    Sentences are split into `strata` contiguous position blocks and classified in rounds of
+    `round_size`, allocated proportionally across strata. After each round a stratified
+    estimate and a `confidence` interval are computed for every category; sampling stops once
+    the widest interval is at most `target_width` percentage points (or every sentence has been
+    classified). Returns a SampledDetectionResult with the estimate, intervals and sample size.
+    """
+    sentences, starts, ends = _segment(text)
+    total = len(sentences)
+    rng = random.Random(seed)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    strata = max(1, min(strata, round_size, total))
+    bounds = [round(h * total / strata) for h in range(strata + 1)]
+    pools = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        pool = list(range(lo, hi))
+        rng.shuffle(pool)
+        pools.append(pool)
+    taken = [0] * len(pools)
+
+    codes, scores = {}, {}
+    estimate = np.zeros(len(CATEGORIES))
+    half_width = np.zeros(len(CATEGORIES))
+    rounds = 0
+    while len(codes) < total:
+        batch = _allocate_round(pools, taken, min(round_size, total - len(codes)))
+        results = _score_sentences([sentences[i] for i in batch], max_batch_tokens, use_cache, backend)
+        for idx, result in zip(batch, results):
+            codes[idx] = CATEGORY_CODES[_label_for(result, threshold)]
+            scores[idx] = result['score']
+        rounds += 1
+        estimate, half_width = _stratified_estimate(pools, taken, codes, z)
+        if 2 * half_width.max() * 100 <= target_width:
+            break
+
+    order = sorted(codes)
+    sample = DetectionResult(text, [starts[i] for i in order], [ends[i] for i in order],
+                             [codes[i] for i in order], [scores[i] for i in order])
+    percentages = {cat: round(float(p) * 100, 2) for cat, p in zip(CATEGORIES, estimate)}
+    intervals = {
+        cat: (round(max(0.0, float(p - h)) * 100, 2), round(min(1.0, float(p + h)) * 100, 2))
+        for cat, p, h in zip(CATEGORIES, estimate, half_width)
+    }
+    return SampledDetectionResult(sample, total, percentages, intervals, confidence, rounds)
+
+
+def detector_throughput_stats(max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS, backend=DEFAULT_DETECTOR_BACKEND):
+    """Sentences/sec and padding-waste counters of the shared batching engine."""
+    return load_detector_engine(max_batch_tokens=max_batch_tokens, backend=backend).stats.snapshot()
+
+
+def detection_cache_stats(backend=DEFAULT_DETECTOR_BACKEND):
+    """Hit/miss counters of the shared detection cache."""
+    return load_detection_cache(backend=backend).stats()
@@ -1,39 +1,13 @@
 # utils/citation_utils.py
-import re
-import nltk
-from nltk.tokenize import sent_tokenize
+from utils.citations import protect_citations, restore_citations
 from utils.model_loaders import load_paraphrase_model
-
-nltk.download('punkt', quiet=True)
-
-# A refined regex to match typical APA-like references (e.g., (Karaman & Frazzoli, 2011, pp. 83–86))
-CITATION_PATTERN = re.compile(
-    r"\(\s*[A-Za-z&\-,\.\s]+(?:et al\.\s*)?,\s*\d{4}(?:,\s*(?:pp?\.\s*\d+(?:-\d+)?))?\s*\)"
-)
-
-def extract_citations(sentence):
-    """Replace APA-like references with placeholders [[REF_x]] and return mapping."""
-    references = CITATION_PATTERN.findall(sentence)
-    mapping = {}
-    replaced = sentence
-    for i, ref in enumerate(references, start=1):
-        placeholder = f"[[REF_{i}]]"
-        mapping[placeholder] = ref
-        replaced = replaced.replace(ref, placeholder, 1)
-    return replaced, mapping
-
-def restore_citations(paraphrased, mapping):
-    """Restore original citations from placeholders."""
-    result = paraphrased
-    for placeholder, ref in mapping.items():
-        result = result.replace(placeholder, ref)
-    return result
+from utils.segmentation import split_sentences
 
 def rewrite_sentence_preserving_citations(sentence):
     """
-    Rewrite a single sentence using a T5-based paraphraser while preserving APA citations.
+    Rewrite a single sentence using a T5-based paraphraser while preserving citations.
     """
-    replaced, mapping = extract_citations(sentence)
+    replaced, citations = protect_citations(sentence)
     if not replaced.strip():
         return sentence
 
@@ -54,12 +28,12 @@ def rewrite_sentence_preserving_citations(sentence):
         max_new_tokens=256
     )
     paraphrased = output[0]["generated_text"].strip()
-    final_sentence = restore_citations(paraphrased, mapping)
+    final_sentence = restore_citations(paraphrased, citations)
     return final_sentence
 
 def rewrite_text_preserving_citations(original_text):
-    """Rewrite input text sentence-by-sentence, preserving APA citations."""
-    sentences = sent_tokenize(original_text)
+    """Rewrite input text sentence-by-sentence, preserving citations."""
+    sentences = split_sentences(original_text)
     output_sentences = []
     for s in sentences:
         new_s = rewrite_sentence_preserving_citations(s)
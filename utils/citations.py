@@ -0,0 +1,253 @@
+# utils/citations.py
+import re
+
+# APA-like parenthetical, e.g. (Karaman & Frazzoli, 2011, pp. 83-86) or (Smith et al., 2020).
+APA_PATTERN = (
+    r"\(\s*[A-Za-z&\-,\.\s]+(?:et al\.\s*)?,\s*\d{4}(?:,\s*(?:pp?\.\s*\d+(?:-\d+)?))?\s*\)"
+)
+# Numeric reference, e.g. [12], [3, 7] or [4-6].
+NUMERIC_PATTERN = r"\[\s*\d+(?:\s*[,;\-–]\s*\d+)*\s*\]"
+# MLA author-page parenthetical, e.g. (Smith 45), (Smith and Jones 12-14) or (Lee et al. 7).
+MLA_PATTERN = (
+    r"\(\s*[A-Z][A-Za-z'\-]+(?:(?:,?\s+(?:and|&)\s+|\s+)[A-Z][A-Za-z'\-]+)?(?:\s+et al\.)?"
+    r"\s+\d+(?:\s*[\-–]\s*\d+)?\s*\)"
+)
+
+CITATION_STYLES = ("apa", "numeric", "mla")
+# Reference definition of what find_citations matches. It is not used for
+# scanning: the APA part backtracks quadratically on long parentheticals
+# without a year (e.g. "(" followed by thousands of spaces).
+CITATION_REGEX = re.compile(
+    f"(?P<apa>{APA_PATTERN})|(?P<numeric>{NUMERIC_PATTERN})|(?P<mla>{MLA_PATTERN})"
+)
+
+# Placeholders are [[REF_n]]; rewriting may add spaces inside the brackets.
+PLACEHOLDER_REGEX = re.compile(r"\[\s*\[\s*REF_(\d+)\s*\]\s*\]")
+
+_OPENER_REGEX = re.compile(r"[(\[]")
+_ASCII_LETTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+_UPPER = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_APA_BODY = _ASCII_LETTERS | frozenset("&-,.")
+_NAME = _ASCII_LETTERS | frozenset("'-")
+_NUMERIC_SEPARATORS = frozenset(",;-\u2013")
+_RANGE_DASHES = frozenset("-\u2013")
+
+# The scanners below walk `text` from an opening bracket and return the end of
+# the citation starting there, or -1. Each one only moves forward over a run
+# that cannot contain another opening bracket (apart from a constant number of
+# retries for MLA's optional parts), so a whole scan is linear in len(text).
+# They accept exactly what the corresponding *_PATTERN matches at that position.
+
+
+def _skip_space(text, i):
+    n = len(text)
+    while i < n and text[i].isspace():
+        i += 1
+    return i
+
+
+def _skip_digits(text, i):
+    n = len(text)
+    while i < n and text[i].isdecimal():
+        i += 1
+    return i
+
+
+def _skip_in(text, i, chars):
+    n = len(text)
+    while i < n and text[i] in chars:
+        i += 1
+    return i
+
+
+def _close_paren(text, i):
+    i = _skip_space(text, i)
+    return i + 1 if i < len(text) and text[i] == ")" else -1
+
+
+def _scan_apa(text, start):
+    # "(" body "," ws YYYY [", " p/pp "." ws pages] ws ")". The body run (letters,
+    # "&-,." and whitespace) is maximal, so the year must begin right where it
+    # stops and the comma must be the run's last non-space character.
+    i = start + 1
+    run_end = i
+    n = len(text)
+    while run_end < n and (text[run_end] in _APA_BODY or text[run_end].isspace()):
+        run_end += 1
+    comma = run_end - 1
+    while comma > i and text[comma].isspace():
+        comma -= 1
+    if comma <= i or text[comma] != ",":
+        return -1
+    year_end = run_end + 4
+    if year_end > n or not all(c.isdecimal() for c in text[run_end:year_end]):
+        return -1
+
+    j = year_end
+    if j < n and text[j] == ",":
+        j = _skip_space(text, j + 1)
+        if j < n and text[j] == "p":
+            j += 1
+            if j < n and text[j] == "p":
+                j += 1
+            if j < n and text[j] == ".":
+                j = _skip_space(text, j + 1)
+                pages_end = _skip_digits(text, j)
+                if pages_end > j:
+                    if (pages_end + 1 < n and text[pages_end] == "-"
+                            and text[pages_end + 1].isdecimal()):
+                        pages_end = _skip_digits(text, pages_end + 1)
+                    end = _close_paren(text, pages_end)
+                    if end != -1:
+                        return end
+    return _close_paren(text, year_end)
+
+
+def _scan_numeric(text, start):
+    # "[" ws N (ws sep ws N)* ws "]"
+    i = _skip_space(text, start + 1)
+    j = _skip_digits(text, i)
+    if j == i:
+        return -1
+    n = len(text)
+    while True:
+        k = _skip_space(text, j)
+        if k >= n or text[k] not in _NUMERIC_SEPARATORS:
+            break
+        k = _skip_space(text, k + 1)
+        m = _skip_digits(text, k)
+        if m == k:
+            break
+        j = m
+    j = _skip_space(text, j)
+    return j + 1 if j < n and text[j] == "]" else -1
+
+
+def _scan_name(text, i):
+    # Capitalized name: [A-Z][A-Za-z'-]+
+    if i < len(text) and text[i] in _UPPER:
+        j = _skip_in(text, i + 1, _NAME)
+        if j > i + 1:
+            return j
+    return -1
+
+
+def _scan_mla_tail(text, i):
+    # [ws "et al."] ws pages ws ")"
+    j = _skip_space(text, i)
+    if j > i and text.startswith("et al.", j):
+        end = _scan_mla_pages(text, j + 6)
+        if end != -1:
+            return end
+    return _scan_mla_pages(text, i)
+
+
+def _scan_mla_pages(text, i):
+    # ws+ N [ws dash ws N] ws ")"
+    j = _skip_space(text, i)
+    if j == i:
+        return -1
+    k = _skip_digits(text, j)
+    if k == j:
+        return -1
+    m = _skip_space(text, k)
+    if m < len(text) and text[m] in _RANGE_DASHES:
+        r = _skip_space(text, m + 1)
+        r_end = _skip_digits(text, r)
+        if r_end > r:
+            end = _close_paren(text, r_end)
+            if end != -1:
+                return end
+    return _close_paren(text, k)
+
+
+def _scan_mla(text, start):
+    # "(" ws Name [second author] tail, trying the optional parts in regex order.
+    name_end = _scan_name(text, _skip_space(text, start + 1))
+    if name_end == -1:
+        return -1
+    n = len(text)
+    # ",? ws+ (and|&) ws+ Name"
+    i = name_end + 1 if name_end < n and text[name_end] == "," else name_end
+    j = _skip_space(text, i)
+    if j > i:
+        for conjunction in ("and", "&"):
+            if text.startswith(conjunction, j):
+                k = j + len(conjunction)
+                m = _skip_space(text, k)
+                second_end = _scan_name(text, m) if m > k else -1
+                if second_end != -1:
+                    end = _scan_mla_tail(text, second_end)
+                    if end != -1:
+                        return end
+    # "ws+ Name"
+    j = _skip_space(text, name_end)
+    if j > name_end:
+        second_end = _scan_name(text, j)
+        if second_end != -1:
+            end = _scan_mla_tail(text, second_end)
+            if end != -1:
+                return end
+    return _scan_mla_tail(text, name_end)
+
+
+def find_citations(text):
+    """
+    Yield (start, end, style) for every citation in `text`, left to right, in
+    one linear-time pass. Equivalent to CITATION_REGEX.finditer, without its
+    backtracking.
+    """
+    pos = 0
+    while True:
+        opener = _OPENER_REGEX.search(text, pos)
+        if opener is None:
+            return
+        start = opener.start()
+        if text[start] == "(":
+            end = _scan_apa(text, start)
+            style = "apa"
+            if end == -1:
+                end = _scan_mla(text, start)
+                style = "mla"
+        else:
+            end = _scan_numeric(text, start)
+            style = "numeric"
+        if end == -1:
+            pos = start + 1
+        else:
+            yield start, end, style
+            pos = end
+
+
+def protect_citations(text):
+    """
+    Replace each citation span with a [[REF_n]] placeholder, n being the
+    1-based span id. Returns (protected_text, citations) where citations[n - 1]
+    is the original text of span n, so duplicates map back one to one.
+    """
+    parts = []
+    citations = []
+    last = 0
+    for start, end, _ in find_citations(text):
+        citations.append(text[start:end])
+        parts.append(text[last:start])
+        parts.append(f"[[REF_{len(citations)}]]")
+        last = end
+    if not citations:
+        return text, citations
+    parts.append(text[last:])
+    return "".join(parts), citations
+
+
+def restore_citations(text, citations):
+    """Put back the citation for every placeholder by span id; unknown ids are left as they are."""
+    if not citations:
+        return text
+
+    def replace_placeholder(match):
+        idx = int(match.group(1))
+        if 1 <= idx <= len(citations):
+            return citations[idx - 1]
+        return match.group(0)
+
+    return PLACEHOLDER_REGEX.sub(replace_placeholder, text)
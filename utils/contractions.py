@@ -0,0 +1,102 @@
+# utils/contractions.py
+import re
+
+# Map common full-token contractions to their expansions. Use exact-token
+# matching first to avoid splitting tokens like "can't" -> "ca not".
+# Whole-word contraction map (preferred replacements)
+WHOLE_CONTRACTIONS = {
+    "can't": "cannot",
+    "won't": "will not",
+    "shan't": "shall not",
+    "ain't": "is not",
+    "i'm": "i am",
+    "it's": "it is",
+    "we're": "we are",
+    "they're": "they are",
+    "you're": "you are",
+    "he's": "he is",
+    "she's": "she is",
+    "that's": "that is",
+    "there's": "there is",
+    "what's": "what is",
+    "who's": "who is",
+    "let's": "let us",
+    "didn't": "did not",
+    "doesn't": "does not",
+    "don't": "do not",
+    "couldn't": "could not",
+    "shouldn't": "should not",
+    "wouldn't": "would not",
+    "isn't": "is not",
+    "aren't": "are not",
+    "weren't": "were not",
+    "hasn't": "has not",
+    "haven't": "have not",
+    "hadn't": "had not",
+}
+
+# Suffix-based fallback contractions (used only if whole-word replacement didn't match)
+SUFFIX_CONTRACTIONS = {
+    "n't": " not",
+    "'re": " are",
+    "'s": " is",
+    "'ll": " will",
+    "'ve": " have",
+    "'d": " would",
+    "'m": " am"
+}
+
+
+class ContractionExpander:
+    """
+    Single-pass contraction expansion over raw text.
+
+    One precompiled pattern covers the whole-word forms (which win, since they
+    start earlier in the word) and the suffix fallbacks. Matching happens on the
+    untokenized text, so quotes and spacing around a contraction are left
+    alone; only the contraction itself is rewritten.
+    """
+
+    def __init__(self, whole=WHOLE_CONTRACTIONS, suffixes=SUFFIX_CONTRACTIONS):
+        self.whole = whole
+        self.suffixes = suffixes
+        whole_alt = "|".join(re.escape(k) for k in sorted(whole, key=len, reverse=True))
+        suffix_alt = "|".join(re.escape(k) for k in sorted(suffixes, key=len, reverse=True))
+        self.pattern = re.compile(
+            rf"(?<![A-Za-z'])(?P<whole>{whole_alt})(?![A-Za-z])"
+            rf"|(?<=[^'\s])(?P<suffix>{suffix_alt})(?![A-Za-z])",
+            re.IGNORECASE,
+        )
+
+    def _replacement(self, match):
+        word = match.group("whole")
+        if word is not None:
+            repl = self.whole[word.lower()]
+            # preserve capitalization of the first character
+            return repl.capitalize() if word[0].isupper() else repl
+        return self.suffixes[match.group("suffix").lower()]
+
+    def edits(self, text):
+        """Yield (start, end, replacement) for every contraction in `text`."""
+        for match in self.pattern.finditer(text):
+            yield match.start(), match.end(), self._replacement(match)
+
+    def expand(self, text):
+        pieces = []
+        pos = 0
+        for start, end, repl in self.edits(text):
+            pieces.append(text[pos:start])
+            pieces.append(repl)
+            pos = end
+        if not pieces:
+            return text
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+
+EXPANDER = ContractionExpander()
+
+
+def expand_contractions_raw(text):
+    """Expand contractions in raw text, leaving everything else untouched."""
+    return EXPANDER.expand(text)
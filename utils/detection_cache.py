@@ -0,0 +1,152 @@
+# utils/detection_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from utils.lru import LRUCache
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "DETECTION_CACHE_PATH", os.path.join(".cache", "detection_cache.sqlite3")
+)
+DEFAULT_MEMORY_ENTRIES = 50000
+
+
+def normalize_sentence(sentence):
+    """Canonical form used for cache keys: NFC, collapsed whitespace, stripped."""
+    return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+
+def cache_key(model_id, sentence):
+    """Content address of a (model id, normalized sentence) pair."""
+    payload = f"{model_id}\0{normalize_sentence(sentence)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class DetectionCache:
+    """
+    Two-tier cache of raw detector outputs ({"label", "score"}) per sentence.
+
+    Lookups hit an in-memory LRU first, then an on-disk SQLite table that
+    survives restarts. Pass `path=None` for a memory-only cache.
+    """
+
+    def __init__(self, model_id, path=DEFAULT_CACHE_PATH, memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.model_id = model_id
+        self.path = path
+        self.memory = LRUCache(maxsize=memory_entries)
+        # Counted per sentence occurrence, so lookups = hits + misses.
+        self.lookups = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.duplicate_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS detections "
+                "(key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _disk_get(self, keys):
+        if not self._conn or not keys:
+            return {}
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, label, score FROM detections WHERE key IN ({marks})", chunk
+                )
+                for key, label, score in rows:
+                    found[key] = {"label": label, "score": score}
+        return found
+
+    def _disk_put(self, items):
+        if not self._conn or not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO detections (key, label, score) VALUES (?, ?, ?)",
+                [(key, r["label"], float(r["score"])) for key, r in items],
+            )
+            self._conn.commit()
+
+    def resolve(self, sentences, score_fn):
+        """
+        Return raw detector results for `sentences` in order. Only sentences
+        missing from both tiers are passed (deduplicated) to `score_fn`.
+        """
+        keys = [cache_key(self.model_id, s) for s in sentences]
+        results = [self.memory.get(k) for k in keys]
+
+        pending = sorted({k for k, r in zip(keys, results) if r is None})
+        from_disk = self._disk_get(pending)
+        for key, result in from_disk.items():
+            self.memory.put(key, result)
+
+        to_score = {}
+        memory_hits = 0
+        disk_hits = 0
+        duplicate_hits = 0
+        for idx, (key, result) in enumerate(zip(keys, results)):
+            if result is not None:
+                memory_hits += 1
+            elif key in from_disk:
+                disk_hits += 1
+            elif key in to_score:
+                # Served by the first occurrence's result, not the model.
+                duplicate_hits += 1
+            else:
+                to_score[key] = sentences[idx]
+        with self._lock:
+            self.lookups += len(keys)
+            self.memory_hits += memory_hits
+            self.disk_hits += disk_hits
+            self.duplicate_hits += duplicate_hits
+            self.misses += len(to_score)
+
+        if to_score:
+            scored = score_fn(list(to_score.values()))
+            fresh = []
+            for key, result in zip(to_score, scored):
+                result = {"label": result["label"], "score": float(result["score"])}
+                self.memory.put(key, result)
+                from_disk[key] = result
+                fresh.append((key, result))
+            self._disk_put(fresh)
+
+        return [r if r is not None else from_disk[k] for k, r in zip(keys, results)]
+
+    def stats(self):
+        """
+        Per-sentence counters across both tiers. Misses are sentences sent to
+        the model; repeats of a missed sentence within one call are duplicate hits.
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits + self.duplicate_hits
+            return {
+                "lookups": self.lookups,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "duplicate_hits": self.duplicate_hits,
+                "misses": self.misses,
+                "memory_entries": len(self.memory),
+                "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            }
+
+    def clear(self):
+        self.memory.clear()
+        if self._conn:
+            with self._lock:
+                self._conn.execute("DELETE FROM detections")
+                self._conn.commit()
@@ -0,0 +1,117 @@
+# utils/detection_result.py
+import numpy as np
+
+CATEGORIES = (
+    "AI-generated",
+    "AI-generated & AI-refined",
+    "Human-written",
+    "Human-written & AI-refined",
+)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+class DetectionResult:
+    """
+    Sentence-level detection output backed by NumPy arrays.
+
+    Each sentence is stored as a [start, end) character span into `text` with a
+    uint8 category code (index into CATEGORIES) and a float32 detector score, so
+    duplicate sentences keep their own entries and sentence strings are not
+    copied. Unpacking still yields the legacy `(classification_map, percentages)`
+    pair: `c_map, pcts = classify_text_hf(text)`.
+    """
+
+    __slots__ = ("text", "starts", "ends", "codes", "scores", "_percentages")
+
+    def __init__(self, text, starts, ends, codes, scores):
+        offset_dtype = np.int32 if len(text) < 2**31 else np.int64
+        self.text = text
+        self.starts = np.asarray(starts, dtype=offset_dtype)
+        self.ends = np.asarray(ends, dtype=offset_dtype)
+        self.codes = np.asarray(codes, dtype=np.uint8)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self._percentages = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        yield self.classification_map
+        yield self.percentages
+
+    def sentence(self, index):
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def label(self, index):
+        return CATEGORIES[self.codes[index]]
+
+    def spans(self):
+        """Yield (start, end, label, score) for every sentence in document order."""
+        for start, end, code, score in zip(self.starts.tolist(), self.ends.tolist(),
+                                           self.codes.tolist(), self.scores.tolist()):
+            yield start, end, CATEGORIES[code], score
+
+    @property
+    def percentages(self):
+        """Category percentages, computed on first access."""
+        if self._percentages is None:
+            counts = np.bincount(self.codes, minlength=len(CATEGORIES))
+            total = int(counts.sum())
+            self._percentages = {
+                cat: round((int(count) / total)*100, 2) if total > 0 else 0
+                for cat, count in zip(CATEGORIES, counts)
+            }
+        return self._percentages
+
+    @property
+    def classification_map(self):
+        """Legacy {sentence: label} dict (duplicate sentences collapse to the last label)."""
+        return {self.text[s:e]: label for s, e, label, _ in self.spans()}
+
+    def summary(self):
+        """Coarse human/AI/mixed split used by the batch and comparison pages."""
+        return _summarize(self.percentages, len(self) > 0)
+
+
+class SampledDetectionResult:
+    """
+    Document-level estimate from a stratified sample of sentences.
+
+    `percentages` are point estimates and `intervals` map each category to a
+    (low, high) confidence interval, both in percent. `sample` is the
+    DetectionResult of the sentences that were actually classified.
+    """
+
+    def __init__(self, sample, total_sentences, percentages, intervals, confidence, rounds):
+        self.sample = sample
+        self.total_sentences = total_sentences
+        self.percentages = percentages
+        self.intervals = intervals
+        self.confidence = confidence
+        self.rounds = rounds
+
+    @property
+    def sample_size(self):
+        return len(self.sample)
+
+    @property
+    def max_interval_width(self):
+        return max((high - low for low, high in self.intervals.values()), default=0.0)
+
+    def summary(self):
+        """Coarse human/AI/mixed split used by the batch and comparison pages."""
+        return _summarize(self.percentages, self.sample_size > 0)
+
+
+def _summarize(pcts, has_sentences):
+    probs = {
+        "Human": pcts["Human-written"] / 100,
+        "AI": pcts["AI-generated"] / 100,
+        "Mixed": (pcts["AI-generated & AI-refined"] + pcts["Human-written & AI-refined"]) / 100,
+    }
+    return {
+        "human_prob": probs["Human"],
+        "ai_prob": probs["AI"],
+        "mixed_prob": probs["Mixed"],
+        "label": max(probs, key=probs.get) if has_sentences else "Unknown",
+    }
@@ -0,0 +1,198 @@
+# utils/detector_engine.py
+import threading
+import time
+
+# Upper bound on padded tokens (longest sentence * batch size) per forward pass.
+DEFAULT_MAX_BATCH_TOKENS = 8192
+# Hard cap on sentences per batch, regardless of how short they are.
+DEFAULT_MAX_BATCH_SIZE = 64
+# RoBERTa's usable context; some tokenizers report a huge sentinel instead.
+DEFAULT_MAX_LENGTH = 512
+# Tokens shared between consecutive windows in window mode.
+DEFAULT_WINDOW_STRIDE = 128
+
+
+class DetectorStats:
+    """Running throughput and padding counters for a BatchedDetector."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.sentences = 0
+            self.windows = 0
+            self.batches = 0
+            self.real_tokens = 0
+            self.padded_tokens = 0
+            self.seconds = 0.0
+
+    def record(self, sentences, batches, real_tokens, padded_tokens, seconds, windows=0):
+        """Add one call's counters; `windows` counts window-mode passes, not sentences."""
+        with self._lock:
+            self.sentences += sentences
+            self.windows += windows
+            self.batches += batches
+            self.real_tokens += real_tokens
+            self.padded_tokens += padded_tokens
+            self.seconds += seconds
+
+    def snapshot(self):
+        """Return the counters plus derived sentences/sec and padding waste."""
+        with self._lock:
+            waste = self.padded_tokens - self.real_tokens
+            return {
+                "sentences": self.sentences,
+                "windows": self.windows,
+                "batches": self.batches,
+                "real_tokens": self.real_tokens,
+                "padded_tokens": self.padded_tokens,
+                "padding_waste_tokens": waste,
+                "padding_waste_ratio": round(waste / self.padded_tokens, 4) if self.padded_tokens else 0.0,
+                "seconds": round(self.seconds, 4),
+                "sentences_per_sec": round(self.sentences / self.seconds, 2) if self.seconds else 0.0,
+            }
+
+
+class BatchedDetector:
+    """
+    Length-bucketed batching front-end for a HF text-classification pipeline.
+
+    Sentences are sorted by token length and grouped into dynamically padded
+    batches whose padded size (longest sentence * batch size) stays within
+    `max_batch_tokens`. Results are scattered back to the original order, so
+    callers get the same list a plain `pipeline(sentences)` call would return.
+    """
+
+    def __init__(self, pipeline, max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        self.pipeline = pipeline
+        self.tokenizer = pipeline.tokenizer
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        model_max = getattr(self.tokenizer, "model_max_length", DEFAULT_MAX_LENGTH)
+        self.max_length = min(model_max, DEFAULT_MAX_LENGTH)
+        self.stats = DetectorStats()
+
+    def token_lengths(self, sentences):
+        """Token count per sentence (special tokens included, truncated to max_length)."""
+        encoded = self.tokenizer(list(sentences), truncation=True, max_length=self.max_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def plan_batches(self, lengths):
+        """Group sentence indices into length-sorted batches within the token budget."""
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batches = []
+        current = []
+        longest = 0
+        for idx in order:
+            longest_with = max(longest, lengths[idx])
+            over_budget = longest_with * (len(current) + 1) > self.max_batch_tokens
+            if current and (over_budget or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current = []
+                longest_with = lengths[idx]
+            current.append(idx)
+            longest = longest_with
+        if current:
+            batches.append(current)
+        return batches
+
+    def __call__(self, sentences, **kwargs):
+        sentences = list(sentences)
+        if not sentences:
+            return []
+
+        start = time.perf_counter()
+        results, batches, real_tokens, padded_tokens = self._score(sentences, **kwargs)
+        self.stats.record(len(sentences), batches, real_tokens, padded_tokens,
+                          time.perf_counter() - start)
+        return results
+
+    def _score(self, sentences, **kwargs):
+        """Run the batched forward passes; returns (results, batches, real, padded tokens)."""
+        lengths = self.token_lengths(sentences)
+        batches = self.plan_batches(lengths)
+        results = [None] * len(sentences)
+        real_tokens = 0
+        padded_tokens = 0
+        for batch in batches:
+            outputs = self.pipeline(
+                [sentences[i] for i in batch],
+                batch_size=len(batch),
+                truncation=True,
+                max_length=self.max_length,
+                **kwargs
+            )
+            for idx, output in zip(batch, outputs):
+                results[idx] = output
+            batch_lengths = [lengths[i] for i in batch]
+            real_tokens += sum(batch_lengths)
+            padded_tokens += max(batch_lengths) * len(batch)
+        return results, len(batches), real_tokens, padded_tokens
+
+    def plan_windows(self, lengths, stride=DEFAULT_WINDOW_STRIDE):
+        """
+        Pack consecutive sentences (by content-token `lengths`) into windows that fit the
+        model context. Each window after the first starts far enough back to re-read about
+        `stride` tokens of its predecessor. Returns [start, end) sentence index pairs.
+        """
+        budget = self.max_length - self.tokenizer.num_special_tokens_to_add()
+        windows = []
+        i = 0
+        while i < len(lengths):
+            j = i
+            used = 0
+            while j < len(lengths) and (j == i or used + lengths[j] <= budget):
+                used += lengths[j]
+                j += 1
+            windows.append((i, j))
+            if j == len(lengths):
+                break
+            k = j
+            overlap = 0
+            while k - 1 > i and overlap + lengths[k - 1] <= stride:
+                k -= 1
+                overlap += lengths[k]
+            i = k
+        return windows
+
+    def score_windows(self, text, spans, stride=DEFAULT_WINDOW_STRIDE):
+        """
+        Window-mode scoring: run one forward pass per packed window of sentences and
+        attribute each window's P(FAKE) to its member sentences, weighted by the share of
+        the window each sentence occupies. `spans` are (start, end) sentence offsets into
+        `text`. Returns per-sentence {"label", "score"} results like __call__.
+        Stats count the real sentences scored, with the windows recorded separately.
+        """
+        if not spans:
+            return []
+        start = time.perf_counter()
+        sentences = [text[start:end] for start, end in spans]
+        specials = self.tokenizer.num_special_tokens_to_add()
+        lengths = [max(1, n - specials) for n in self.token_lengths(sentences)]
+        windows = self.plan_windows(lengths, stride)
+        outputs, batches, real_tokens, padded_tokens = self._score(
+            [text[spans[i][0]:spans[j - 1][1]] for i, j in windows], top_k=None)
+
+        weighted = [0.0] * len(spans)
+        weights = [0.0] * len(spans)
+        for (i, j), output in zip(windows, outputs):
+            p_fake = next((o["score"] for o in output if o["label"].upper() == "FAKE"), 0.0)
+            window_tokens = sum(lengths[i:j])
+            for idx in range(i, j):
+                share = lengths[idx] / window_tokens
+                weighted[idx] += share * p_fake
+                weights[idx] += share
+
+        results = []
+        for total, weight in zip(weighted, weights):
+            p_fake = total / weight
+            if p_fake >= 0.5:
+                results.append({"label": "FAKE", "score": p_fake})
+            else:
+                results.append({"label": "REAL", "score": 1.0 - p_fake})
+        self.stats.record(len(spans), batches, real_tokens, padded_tokens,
+                          time.perf_counter() - start, windows=len(windows))
+        return results
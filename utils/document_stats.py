@@ -0,0 +1,115 @@
+# utils/document_stats.py
+import hashlib
+import os
+import re
+from utils.lru import LRUCache
+from utils.segmentation import sentence_spans
+
+# Texts longer than this (in characters) are counted with the regex mode when mode="auto".
+FAST_STATS_CHARS = int(os.environ.get("FAST_STATS_CHARS", str(500_000)))
+# Number of distinct texts whose stats are memoized.
+STATS_CACHE_ENTRIES = 256
+
+STATS_MODES = ("auto", "nltk", "fast")
+
+# Approximates the Treebank tokenizer used by word_tokenize: apostrophes split
+# words ("don't" -> do/n't, "it's" -> it/'s), hyphens and inner periods/commas
+# in numbers and abbreviations do not, and each punctuation mark is a token
+# except for runs such as "...", "--", `` and ''.
+FAST_TOKEN_REGEX = re.compile(r"\w+(?:[-.,]\w+)*|'\w+|\.\.\.|--|``|''|[^\w\s]")
+# "cannot" is split into "can" + "not" by the Treebank tokenizer.
+FAST_CANNOT_REGEX = re.compile(r"\bcannot\b", re.IGNORECASE)
+# A sentence ends at ., ! or ? (plus closing quotes/brackets) followed by whitespace or the end.
+FAST_SENTENCE_END_REGEX = re.compile(r"[.!?]+[\"')\]]*(?=\s|$)")
+
+_word_tokenizer = None
+_stats_cache = LRUCache(maxsize=STATS_CACHE_ENTRIES)
+
+
+def _treebank():
+    global _word_tokenizer
+    if _word_tokenizer is None:
+        from nltk.tokenize import NLTKWordTokenizer
+        _word_tokenizer = NLTKWordTokenizer()
+    return _word_tokenizer
+
+
+class DocumentStats:
+    """Word, sentence and character counts of one text."""
+
+    def __init__(self, words, sentences, characters, mode):
+        self.words = words
+        self.sentences = sentences
+        self.characters = characters
+        self.mode = mode
+
+    @classmethod
+    def from_text(cls, text, mode="auto"):
+        """
+        Count `text` once. "nltk" matches len(word_tokenize(text)) and
+        len(sent_tokenize(text)) exactly, reusing the shared sentence spans;
+        "fast" is a single regex pass that approximates them; "auto" picks
+        "fast" above FAST_STATS_CHARS characters.
+        """
+        if mode not in STATS_MODES:
+            raise ValueError(f"Unknown stats mode {mode!r}; expected one of {STATS_MODES}")
+        if mode == "auto":
+            mode = "fast" if len(text) > FAST_STATS_CHARS else "nltk"
+
+        if mode == "nltk":
+            spans = sentence_spans(text)
+            tokenizer = _treebank()
+            words = sum(len(tokenizer.tokenize(text[start:end])) for start, end in spans)
+            sentences = len(spans)
+        else:
+            words = (sum(1 for _ in FAST_TOKEN_REGEX.finditer(text))
+                     + sum(1 for _ in FAST_CANNOT_REGEX.finditer(text)))
+            sentences = 0
+            last_end = 0
+            for match in FAST_SENTENCE_END_REGEX.finditer(text):
+                sentences += 1
+                last_end = match.end()
+            if text[last_end:].strip():
+                # Trailing text without a terminator is still a sentence.
+                sentences += 1
+        return cls(words, sentences, len(text), mode)
+
+    def delta(self, other):
+        """
+        Words and sentences added going from `self` to `other`. Both must be
+        counted in the same mode (see comparison_mode); differences between
+        "nltk" and "fast" counts would otherwise show up as added words.
+        """
+        if self.mode != other.mode:
+            raise ValueError(f"Cannot compare stats counted in {self.mode!r} and {other.mode!r} mode")
+        return {
+            "words_added": other.words - self.words,
+            "sentences_added": other.sentences - self.sentences,
+        }
+
+    def as_dict(self):
+        return {
+            "words": self.words,
+            "sentences": self.sentences,
+            "characters": self.characters,
+            "mode": self.mode,
+        }
+
+    def __repr__(self):
+        return (f"DocumentStats(words={self.words}, sentences={self.sentences}, "
+                f"characters={self.characters}, mode={self.mode!r})")
+
+
+def comparison_mode(*texts):
+    """The one counting mode to use for all of `texts`: "fast" if any is longer than FAST_STATS_CHARS."""
+    return "fast" if max(len(text) for text in texts) > FAST_STATS_CHARS else "nltk"
+
+
+def document_stats(text, mode="auto"):
+    """DocumentStats for `text`, memoized per text hash so repeated lookups in a request are free."""
+    key = (mode, hashlib.sha1(text.encode("utf-8")).hexdigest())
+    stats = _stats_cache.get(key)
+    if stats is None:
+        stats = DocumentStats.from_text(text, mode)
+        _stats_cache.put(key, stats)
+    return stats
@@ -0,0 +1,323 @@
+# utils/humanize_pipeline.py
+"""
+The humanizer's rewriting core: stage selection, synonym and transition
+stages over TokenDocuments, and seeded paragraph rewriting in-process or on a
+process pool. It imports nothing UI-related, so pool workers can load it
+(and the spaCy model, once, in their initializer) without re-running the
+Streamlit page.
+"""
+import multiprocessing
+import random
+from nltk.corpus import wordnet
+from utils.contractions import EXPANDER
+from utils.normalization import normalize_spacing
+from utils.stage_timings import StageTimings, measure
+from utils.synonym_index import load_synonym_index
+from utils.token_document import build_documents
+
+# The humanizer only reads token text and coarse POS, which come from the
+# tagger + attribute_ruler (fed by tok2vec); the parser, NER and lemmatizer
+# are excluded so they are neither loaded nor run.
+SPACY_EXCLUDE = ["parser", "senter", "ner", "lemmatizer"]
+# Defaults for batched processing with nlp.pipe.
+SPACY_BATCH_SIZE = 256
+SPACY_N_PROCESS = 1
+# Bump whenever a change alters humanized output, so cached results are not reused.
+PIPELINE_VERSION = "7"
+# Rewriting stages in their default order; a request may run any subset.
+# "citations" and "contractions" apply while paragraphs are parsed,
+# "synonyms" and "transitions" edit the parsed tokens in the order given,
+# and "normalize" cleans up the rendered text, so every order must keep
+# those three phases in sequence.
+HUMANIZE_STAGES = ("citations", "contractions", "synonyms", "transitions", "normalize")
+_STAGE_PHASES = {"citations": 0, "contractions": 0, "synonyms": 1, "transitions": 1, "normalize": 2}
+
+# Loaded by load_nlp(); None until then, or when the model is not installed.
+nlp = None
+_nlp_loaded = False
+
+
+def load_nlp():
+    """Load the trimmed spaCy pipeline once per process; None if en_core_web_sm is missing."""
+    global nlp, _nlp_loaded
+    if not _nlp_loaded:
+        import spacy
+
+        try:
+            nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+        except OSError:
+            nlp = None
+        _nlp_loaded = True
+    return nlp
+
+########################################
+# Step 2: Expansions, Synonyms, & Transitions
+########################################
+ACADEMIC_TRANSITIONS = [
+    "Moreover,",
+    "Additionally,",
+    "Furthermore,",
+    "Hence,",
+    "Therefore,",
+    "Consequently,",
+    "Nonetheless,",
+    "Nevertheless,",
+    "In contrast,",
+    "On the other hand,",
+    "In addition,",
+    "As a result,",
+]
+
+
+def draw_synonym(word, pos, p_syn=0.2, rng=random):
+    """`word` or, with probability `p_syn` for WordNet-known content words, a synonym of it."""
+    if pos in ["ADJ", "NOUN", "VERB", "ADV"] and has_synsets(word):
+        if rng.random() < p_syn:
+            synonyms = get_synonyms(word, pos)
+            if synonyms:
+                return rng.choice(synonyms)
+    return word
+
+
+def apply_synonyms(document, p_syn=0.2, rng=random, start=0, end=None):
+    """Draw synonyms for the unprotected tokens start..end of a TokenDocument, in place."""
+    words = document.words
+    for i in range(start, len(words) if end is None else end):
+        if not document.protected[i]:
+            words[i] = draw_synonym(words[i], document.pos[i], p_syn, rng)
+
+
+def draw_transition(p_transition=0.2, rng=random):
+    """An academic transition with probability `p_transition`, else None."""
+    if rng.random() < p_transition:
+        return rng.choice(ACADEMIC_TRANSITIONS)
+    return None
+
+
+def has_synsets(word):
+    """True if WordNet knows `word` under any POS (index lookup when available)."""
+    index = load_synonym_index()
+    if index is not None:
+        return index.known(word)
+    return bool(wordnet.synsets(word))
+
+
+# spaCy coarse POS prefix -> WordNet POS (same values as wordnet.ADJ etc., spelled
+# out so the lookup doesn't force the lazy corpus loader to load).
+WORDNET_POS = (("ADJ", "a"), ("NOUN", "n"), ("ADV", "r"), ("VERB", "v"))
+
+
+def get_synonyms(word, pos):
+    wn_pos = next((wn for prefix, wn in WORDNET_POS if pos.startswith(prefix)), None)
+    if not wn_pos:
+        return []
+
+    # Precomputed, memory-mapped index: O(log n) lookups without the corpus reader.
+    index = load_synonym_index()
+    if index is not None:
+        return index.synonyms(word, wn_pos)
+
+    # Deduplicated in synset/lemma order, like SynonymIndex.synonyms, so
+    # rng.choice picks the same synonym for a seed on every run and worker.
+    synonyms = []
+    for syn in wordnet.synsets(word, pos=wn_pos):
+        for lemma in syn.lemmas():
+            lemma_name = lemma.name().replace("_", " ")
+            if lemma_name.lower() != word.lower() and lemma_name not in synonyms:
+                synonyms.append(lemma_name)
+    return synonyms
+
+
+########################################
+# Step 3: Minimal "Humanize" line-by-line
+########################################
+def resolve_stages(stages=None):
+    """
+    Validate a requested list of stage names (None means HUMANIZE_STAGES) and
+    return it as a tuple. Raises ValueError for unknown or repeated stages and
+    for orders that break the parse / token / text phases.
+    """
+    if stages is None:
+        return HUMANIZE_STAGES
+    stages = tuple(stages)
+    unknown = [name for name in stages if name not in _STAGE_PHASES]
+    if unknown:
+        raise ValueError(f"Unknown humanizer stage(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(HUMANIZE_STAGES)}")
+    if len(set(stages)) != len(stages):
+        raise ValueError("Each humanizer stage can be listed only once")
+    phases = [_STAGE_PHASES[name] for name in stages]
+    if phases != sorted(phases):
+        raise ValueError("Stages must keep their phases in order: citations/contractions, "
+                         "then synonyms/transitions, then normalize")
+    return stages
+
+
+def synonyms_stage(documents, rngs, p_syn=0.2, p_trans=0.2):
+    """Draw synonyms for the editable tokens of every document."""
+    for document, rng in zip(documents, rngs):
+        apply_synonyms(document, p_syn, rng)
+
+
+def transitions_stage(documents, rngs, p_syn=0.2, p_trans=0.2):
+    """Maybe give every sentence an academic transition prefix."""
+    for document, rng in zip(documents, rngs):
+        document.prefixes = [draw_transition(p_trans, rng) for _ in document.sentence_starts]
+
+
+# Stages that edit parsed TokenDocuments, by name.
+TOKEN_STAGES = {"synonyms": synonyms_stage, "transitions": transitions_stage}
+
+
+def humanize_documents(documents, p_syn=0.2, p_trans=0.2, rngs=None, stages=HUMANIZE_STAGES,
+                       timings=None):
+    """
+    Run the token stages named in `stages`, in that order, over parsed
+    TokenDocuments in place. Each document draws from its own RNG in `rngs`
+    (the global `random` by default).
+    """
+    if rngs is None:
+        rngs = [random] * len(documents)
+    for name in stages:
+        stage = TOKEN_STAGES.get(name)
+        if stage is not None:
+            with measure(timings, name):
+                stage(documents, rngs, p_syn=p_syn, p_trans=p_trans)
+    return documents
+
+
+def humanize_paragraphs(paragraphs, p_syn=0.2, p_trans=0.2,
+                        batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS,
+                        rng=random, rngs=None, spans=None, stages=None, timings=None):
+    """
+    Humanize a list of paragraphs. Each paragraph is parsed once into a
+    TokenDocument (see utils.token_document): contractions are expanded,
+    citations become protected tokens that no stage edits, and all
+    paragraphs share one nlp.pipe pass. The token stages then edit the
+    arrays in place and every paragraph is rendered to a string exactly once,
+    its sentences joined by single spaces, before spacing is normalized.
+
+    `stages` picks and orders the stages (see resolve_stages); each one, plus
+    sentence segmentation, parsing and rendering, is timed into `timings`
+    (a StageTimings) when given. Random choices are drawn from `rng` (the
+    global `random` module by default), or from `rngs`, one RNG per
+    paragraph, when given. `spans` optionally gives the sentence spans of
+    each paragraph.
+    """
+    stages = resolve_stages(stages)
+    documents = build_documents(paragraphs, nlp=nlp, spans=spans,
+                                batch_size=batch_size, n_process=n_process,
+                                expander=EXPANDER if "contractions" in stages else None,
+                                protect_citations="citations" in stages, timings=timings)
+    if rngs is None:
+        rngs = [rng] * len(documents)
+    humanize_documents(documents, p_syn=p_syn, p_trans=p_trans, rngs=rngs, stages=stages,
+                       timings=timings)
+    with measure(timings, "render"):
+        rendered = [document.render() for document in documents]
+    if "normalize" in stages:
+        with measure(timings, "normalize"):
+            rendered = [normalize_spacing(text) for text in rendered]
+    return rendered
+
+
+def minimal_rewriting(text, p_syn=0.2, p_trans=0.2,
+                      batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS, rng=random,
+                      stages=None, timings=None):
+    return humanize_paragraphs([text], p_syn=p_syn, p_trans=p_trans,
+                               batch_size=batch_size, n_process=n_process, rng=rng,
+                               stages=stages, timings=timings)[0]
+
+
+########################################
+# Paragraph-level rewriting (seeded / parallel)
+########################################
+# Process pools are kept per worker count. Workers are spawned rather than
+# forked (forking a threaded Streamlit/uvicorn process can deadlock on locks
+# held at fork time) and only import this module.
+_paragraph_pools = {}
+
+
+def paragraph_rng(seed, index):
+    """RNG for paragraph `index` of a request, derived only from (seed, index)."""
+    return random.Random(f"{seed}:{index}")
+
+
+def rewrite_paragraphs(paragraphs, p_syn=0.2, p_trans=0.2, seed=0,
+                       batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS,
+                       stages=None, timings=None):
+    """
+    Rewrite `(index, paragraph)` pairs, giving each paragraph its own
+    paragraph_rng(seed, index). All paragraphs still share one nlp.pipe pass.
+    Returns the rewritten paragraphs in input order.
+    """
+    return humanize_paragraphs([paragraph for _, paragraph in paragraphs],
+                               p_syn=p_syn, p_trans=p_trans,
+                               batch_size=batch_size, n_process=n_process,
+                               rngs=[paragraph_rng(seed, index) for index, _ in paragraphs],
+                               stages=stages, timings=timings)
+
+
+def _rewrite_paragraph_chunk(args):
+    """
+    Process-pool entry point for rewrite_paragraphs. Returns (paragraphs, timings),
+    timings being the worker's StageTimings.as_dict() when `track_memory` is
+    not None (timing requested), else None.
+    """
+    paragraphs, p_syn, p_trans, seed, stages, track_memory = args
+    if track_memory is None:
+        return rewrite_paragraphs(paragraphs, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                  stages=stages), None
+    with StageTimings(track_memory=track_memory) as timings:
+        rewritten = rewrite_paragraphs(paragraphs, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                       stages=stages, timings=timings)
+    return rewritten, timings.as_dict()
+
+
+def _init_paragraph_worker():
+    """Pool initializer: load spaCy and open the synonym index once per worker."""
+    load_nlp()
+    load_synonym_index()
+
+
+def _get_paragraph_pool(workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = _paragraph_pools.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_paragraph_worker,
+        )
+        _paragraph_pools[workers] = pool
+    return pool
+
+
+def rewrite_paragraphs_parallel(paragraphs, p_syn=0.2, p_trans=0.2, seed=0, workers=2,
+                                stages=None, timings=None):
+    """
+    Fan `(index, paragraph)` pairs out to a process pool in contiguous chunks
+    (a few per worker, to balance uneven paragraph lengths). Because every
+    paragraph's RNG depends only on (seed, index), the output is identical to
+    rewrite_paragraphs for any worker count. Workers time their own stages
+    and the results are merged into `timings`, so stage times add up the
+    work of all workers rather than wall time.
+    """
+    if workers <= 1 or len(paragraphs) <= 1:
+        return rewrite_paragraphs(paragraphs, p_syn=p_syn, p_trans=p_trans, seed=seed,
+                                  stages=stages, timings=timings)
+    n_chunks = min(len(paragraphs), workers * 4)
+    size = -(-len(paragraphs) // n_chunks)
+    chunks = [paragraphs[i:i + size] for i in range(0, len(paragraphs), size)]
+    pool = _get_paragraph_pool(workers)
+    track_memory = None if timings is None else timings.track_memory
+    results = pool.map(_rewrite_paragraph_chunk,
+                       [(chunk, p_syn, p_trans, seed, stages, track_memory) for chunk in chunks])
+    rewritten = []
+    for chunk, chunk_timings in results:
+        rewritten.extend(chunk)
+        if chunk_timings:
+            timings.merge(chunk_timings)
+    return rewritten
+
@@ -1,8 +1,9 @@
 import streamlit as st
 import nltk
-import re
-from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tokenize import word_tokenize
 from transformers import pipeline
+from utils.segmentation import split_sentences
+from utils.document_stats import comparison_mode, document_stats
 
 
 # Make sure NLTK resources are downloaded
@@ -11,11 +12,6 @@ try:
 except LookupError:
     nltk.download('punkt', quiet=True)
 
-# CITATION_REGEX: attempts to match something like (Smith et al., 2023, pp. 10-12)
-CITATION_REGEX = re.compile(
-    r"\(\s*[A-Za-z&\-,\.\s]+(?:et al\.\s*)?,\s*\d{4}(?:,\s*(?:pp?\.\s*\d+(?:-\d+)?))?\s*\)"
-)
-
 @st.cache_resource
 def load_t5_model():
     """
@@ -23,34 +19,11 @@ def load_t5_model():
     """
     return pipeline("text2text-generation", model="google/flan-t5-base")
 
-def extract_citations(text):
-    """
-    Replace APA-like references with placeholders [[REF_1]], [[REF_2]], etc.
-    Returns replaced_text and placeholder_map.
-    """
-    refs = CITATION_REGEX.findall(text)
-    placeholder_map = {}
-    replaced_text = text
-    for i, r in enumerate(refs, start=1):
-        placeholder = f"[[REF_{i}]]"
-        placeholder_map[placeholder] = r
-        replaced_text = replaced_text.replace(r, placeholder, 1)
-    return replaced_text, placeholder_map
-
-def restore_citations(text, placeholder_map):
-    """
-    Put original references back into the text.
-    """
-    restored = text
-    for placeholder, ref_text in placeholder_map.items():
-        restored = restored.replace(placeholder, ref_text)
-    return restored
-
 def sentence_level_rewrite(text, t5_pipeline, min_len=0, max_len=512):
     """
     Splits text by sentences, rewrites each with T5, then rejoins.
     """
-    sentences = sent_tokenize(text)
+    sentences = split_sentences(text)
     out_sents = []
     for sent in sentences:
         if not sent.strip():
@@ -81,12 +54,6 @@ def minimal_humanize_text(text):
     rewritten = sentence_level_rewrite(text, t5)
     return rewritten
 
-def count_words(text):
-    return len(word_tokenize(text))
-
-def count_sentences(text):
-    return len(sent_tokenize(text))
-
 ###############################################
 # Streamlit App
 ###############################################
@@ -101,14 +68,17 @@ def main():
             st.warning("Please enter some text.")
             return
         
-        original_wordcount = count_words(input_text)
-        original_sentcount = count_sentences(input_text)
-        
         with st.spinner("Rewriting text..."):
             out_text = minimal_humanize_text(input_text)
 
-        new_wordcount = count_words(out_text)
-        new_sentcount = count_sentences(out_text)
+        # Count both texts in one mode so the counts are comparable.
+        mode = comparison_mode(input_text, out_text)
+        original_stats = document_stats(input_text, mode)
+        original_wordcount = original_stats.words
+        original_sentcount = original_stats.sentences
+        new_stats = document_stats(out_text, mode)
+        new_wordcount = new_stats.words
+        new_sentcount = new_stats.sentences
 
         st.subheader("Rewritten Output")
         st.text_area("Humanized Text", out_text, height=200)
@@ -0,0 +1,125 @@
+# utils/inference_governor.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Concurrent forward passes allowed process-wide (0 = derive from the core count).
+MAX_CONCURRENT_INFERENCES = int(os.environ.get("MAX_CONCURRENT_INFERENCES", "0"))
+
+
+def _default_concurrency(cores):
+    # A couple of concurrent passes keeps latency down for small requests without
+    # splitting the cores so thinly that each pass crawls.
+    return max(1, min(4, cores // 4))
+
+
+class InferenceGovernor:
+    """
+    Caps concurrent forward passes with a semaphore and sizes torch's thread pools so
+    that `max_concurrent` passes together use roughly all cores instead of each pass
+    grabbing every core. Tracks queue depth and wait-time metrics.
+    """
+
+    def __init__(self, max_concurrent=None, intra_op_threads=None, inter_op_threads=1):
+        cores = os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or MAX_CONCURRENT_INFERENCES or _default_concurrency(cores)
+        self.intra_op_threads = intra_op_threads or max(1, cores // self.max_concurrent)
+        self.inter_op_threads = inter_op_threads
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._threads_configured = False
+
+    def configure_threads(self):
+        """Apply the intra-/inter-op thread counts to torch (once per process)."""
+        if self._threads_configured:
+            return
+        self._threads_configured = True
+        try:
+            import torch
+        except ImportError:
+            return
+        torch.set_num_threads(self.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(self.inter_op_threads)
+        except RuntimeError:
+            # Only settable before the first parallel op; keep torch's value afterwards.
+            pass
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the `max_concurrent` inference slots for the duration of the block."""
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        start = time.perf_counter()
+        self._semaphore.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.queue_depth -= 1
+            self.active += 1
+            self.waits += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._semaphore.release()
+
+    def wrap(self, pipeline):
+        self.configure_threads()
+        return GovernedPipeline(pipeline, self)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "intra_op_threads": self.intra_op_threads,
+                "inter_op_threads": self.inter_op_threads,
+                "active": self.active,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "passes": self.waits,
+                "avg_wait_ms": round(self.total_wait / self.waits * 1000, 2) if self.waits else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+
+
+class GovernedPipeline:
+    """Pipeline proxy whose calls run inside an InferenceGovernor slot."""
+
+    def __init__(self, pipeline, governor):
+        self.pipeline = pipeline
+        self.governor = governor
+
+    def __call__(self, *args, **kwargs):
+        with self.governor.slot():
+            return self.pipeline(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.pipeline, name)
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_inference_governor():
+    """Process-wide governor shared by every loaded pipeline."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = InferenceGovernor()
+    return _governor
+
+
+def inference_stats():
+    return get_inference_governor().stats()
@@ -0,0 +1,68 @@
+# utils/lru.py
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU mapping with hit/miss counters.
+
+    `sizeof` measures each value (defaults to 1, i.e. an entry count); the
+    least recently used entries are evicted once the total exceeds `maxsize`.
+    """
+
+    def __init__(self, maxsize=4096, sizeof=None):
+        self.maxsize = maxsize
+        self.sizeof = sizeof or (lambda value: 1)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.size -= self._data.pop(key)[1]
+            if size > self.maxsize:
+                return
+            self._data[key] = (value, size)
+            self.size += size
+            while self.size > self.maxsize:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "size": self.size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
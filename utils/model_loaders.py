@@ -1,13 +1,61 @@
 # utils/model_loaders.py
+import os
 import streamlit as st
 from transformers import pipeline
+from utils.detector_engine import BatchedDetector, DEFAULT_MAX_BATCH_TOKENS
+from utils.detection_cache import DetectionCache, DEFAULT_CACHE_PATH
+from utils.inference_governor import get_inference_governor
+
+DETECTOR_MODEL_ID = "roberta-base-openai-detector"
+DETECTOR_BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_DETECTOR_BACKEND = os.environ.get("DETECTOR_BACKEND", "torch")
+
+def detector_cache_id(backend=DEFAULT_DETECTOR_BACKEND):
+    """Model id used to key cached scores; quantized backends score slightly differently."""
+    return DETECTOR_MODEL_ID if backend == "torch" else f"{DETECTOR_MODEL_ID}@{backend}"
+
+def build_detector_pipeline(backend=DEFAULT_DETECTOR_BACKEND):
+    """
+    Build the roberta-base-openai-detector pipeline without Streamlit caching.
+
+    `backend` is one of "torch" (full-precision PyTorch), "onnx" (ONNX Runtime) or
+    "onnx-int8" (dynamically quantized ONNX Runtime). ONNX artifacts are exported
+    once to DETECTOR_ONNX_DIR and reused afterwards.
+    """
+    if backend not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown detector backend {backend!r}; expected one of {DETECTOR_BACKENDS}")
+    if backend == "torch":
+        return pipeline("text-classification", model=DETECTOR_MODEL_ID)
+    from utils.onnx_backend import load_onnx_pipeline
+    return load_onnx_pipeline(DETECTOR_MODEL_ID, quantize=backend == "onnx-int8")
+
+@st.cache_resource
+def load_detector_model(backend=DEFAULT_DETECTOR_BACKEND):
+    """
+    Load the roberta-base-openai-detector pipeline for AI text detection. Calls go
+    through the shared inference governor, which caps concurrent forward passes.
+    """
+    return get_inference_governor().wrap(build_detector_pipeline(backend))
+
+@st.cache_resource
+def load_detector_engine(max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS, backend=DEFAULT_DETECTOR_BACKEND):
+    """Wrap the detector pipeline in a length-bucketed batching engine."""
+    return BatchedDetector(load_detector_model(backend), max_batch_tokens=max_batch_tokens)
+
+@st.cache_resource
+def load_sharded_detector(workers, torch_threads=None, max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS,
+                          backend=DEFAULT_DETECTOR_BACKEND):
+    """Start (once) a process pool in which every worker holds its own detector."""
+    from utils.sharded_detection import ShardedDetector
+    return ShardedDetector(workers, torch_threads=torch_threads,
+                           max_batch_tokens=max_batch_tokens, backend=backend)
 
 @st.cache_resource
-def load_detector_model():
-    """Load the roberta-base-openai-detector pipeline for AI text detection."""
-    return pipeline("text-classification", model="roberta-base-openai-detector")
+def load_detection_cache(path=DEFAULT_CACHE_PATH, backend=DEFAULT_DETECTOR_BACKEND):
+    """Open the per-sentence detection score cache (memory LRU + SQLite)."""
+    return DetectionCache(detector_cache_id(backend), path=path)
 
 @st.cache_resource
 def load_paraphrase_model():
     """Load the T5-based paraphrasing pipeline (e.g., google/flan-t5-base)."""
-    return pipeline("text2text-generation", model="google/flan-t5-base")
+    return get_inference_governor().wrap(pipeline("text2text-generation", model="google/flan-t5-base"))
@@ -0,0 +1,43 @@
+# utils/normalization.py
+import re
+
+# Whitespace runs to fix: before punctuation or ")" and after "(" they are
+# removed, otherwise runs of two or more collapse to one space. Each
+# alternative can only start at the first character of a run, so it always
+# sees the whole run, as the separate passes did.
+_SPACE_FIX = r"[ \t]+(?=[.,;:!?)])|(?<=\()[ \t]+|(?P<collapse>[ \t]{2,})"
+_SPACE_REGEX = re.compile(_SPACE_FIX)
+# Tokenized quotes (`` ... '') plus the whitespace fixes, in one pattern.
+_NORMALIZE_REGEX = re.compile(r"``\s*(?P<body>.+?)\s*''|" + _SPACE_FIX)
+
+
+def _fix_space(match):
+    return "" if match.lastgroup is None else " "
+
+
+def _normalize(match):
+    body = match.group("body")
+    if body is None:
+        return "" if match.lastgroup is None else " "
+    if body.isspace():
+        # Only happens for `` followed by whitespace and '': the body is the
+        # last whitespace character, which the collapse pass would have turned
+        # into a single space if it ended a longer run.
+        if body in " \t" and match.string[match.start("body") - 1] in " \t":
+            return '" "'
+        return f'"{body}"'
+    return f'"{_SPACE_REGEX.sub(_fix_space, body)}"'
+
+
+def normalize_spacing(text):
+    """
+    Normalize spaces around punctuation and tokenized quotes in one scan,
+    keeping newlines. The output is identical to applying these in order:
+
+        [ \\t]+([.,;:!?])  -> \\1     no space before punctuation
+        (\\()[ \\t]+       -> \\1     no space after "("
+        [ \\t]+(\\))       -> \\1     no space before ")"
+        [ \\t]{2,}        -> " "    collapse runs of spaces/tabs
+        ``\\s*(.+?)\\s*''  -> "\\1"   tokenized quotes back to plain quotes
+    """
+    return _NORMALIZE_REGEX.sub(_normalize, text)
@@ -0,0 +1,64 @@
+# utils/onnx_backend.py
+import os
+import platform
+from transformers import AutoTokenizer, pipeline
+
+DEFAULT_ARTIFACT_DIR = os.environ.get("DETECTOR_ONNX_DIR", os.path.join(".cache", "onnx"))
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_quantized.onnx"
+
+
+def _require_optimum():
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError as exc:
+        raise ImportError(
+            "The 'onnx' and 'onnx-int8' detector backends need optimum with ONNX Runtime. "
+            "Install with: pip install 'optimum[onnxruntime]'"
+        ) from exc
+    return ORTModelForSequenceClassification, ORTQuantizer, AutoQuantizationConfig
+
+
+def _artifact_path(model_id, artifact_dir, quantize):
+    name = model_id.replace("/", "--")
+    return os.path.join(artifact_dir, name, "int8" if quantize else "fp32")
+
+
+def _quantization_config(AutoQuantizationConfig):
+    """Dynamic (weights-only calibration free) int8 config for the host CPU."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+
+def ensure_onnx_artifact(model_id, artifact_dir=DEFAULT_ARTIFACT_DIR, quantize=False):
+    """
+    Export `model_id` to ONNX (and optionally int8-quantize it) once, returning the
+    artifact directory. Existing artifacts are reused on later starts.
+    """
+    ORTModel, ORTQuantizer, AutoQuantizationConfig = _require_optimum()
+
+    fp32_dir = _artifact_path(model_id, artifact_dir, quantize=False)
+    if not os.path.exists(os.path.join(fp32_dir, FP32_FILE)):
+        model = ORTModel.from_pretrained(model_id, export=True)
+        model.save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(fp32_dir)
+    if not quantize:
+        return fp32_dir
+
+    int8_dir = _artifact_path(model_id, artifact_dir, quantize=True)
+    if not os.path.exists(os.path.join(int8_dir, INT8_FILE)):
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name=FP32_FILE)
+        quantizer.quantize(save_dir=int8_dir, quantization_config=_quantization_config(AutoQuantizationConfig))
+        AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(int8_dir)
+    return int8_dir
+
+
+def load_onnx_pipeline(model_id, artifact_dir=DEFAULT_ARTIFACT_DIR, quantize=False):
+    """Build a text-classification pipeline backed by ONNX Runtime."""
+    ORTModel, _, _ = _require_optimum()
+    path = ensure_onnx_artifact(model_id, artifact_dir, quantize=quantize)
+    model = ORTModel.from_pretrained(path, file_name=INT8_FILE if quantize else FP32_FILE)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
@@ -2,7 +2,7 @@
 import fitz
 from io import BytesIO
 import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
+from utils.document_stats import document_stats
 
 nltk.download('punkt', quiet=True)
 
@@ -16,7 +16,7 @@ def extract_text_from_pdf(pdf_bytes):
     return all_text
 
 def word_count(text):
-    return len(word_tokenize(text))
+    return document_stats(text).words
 
 def generate_annotated_pdf(pdf_bytes, classification_map):
     """Generate an annotated PDF with color-coded highlights for AI text."""
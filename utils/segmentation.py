@@ -0,0 +1,64 @@
+# utils/segmentation.py
+import hashlib
+import threading
+import nltk
+from utils.lru import LRUCache
+
+# Number of distinct texts whose sentence spans are memoized.
+SPAN_CACHE_ENTRIES = 256
+
+_tokenizers = {}
+_tokenizer_lock = threading.Lock()
+_span_cache = LRUCache(maxsize=SPAN_CACHE_ENTRIES)
+
+
+def _load_punkt(language):
+    try:
+        # nltk >= 3.8.2 ships Punkt parameters as punkt_tab instead of pickles.
+        from nltk.tokenize import PunktTokenizer
+    except ImportError:
+        nltk.download('punkt', quiet=True)
+        return nltk.data.load(f"tokenizers/punkt/{language}.pickle")
+    try:
+        return PunktTokenizer(language)
+    except LookupError:
+        nltk.download('punkt_tab', quiet=True)
+        return PunktTokenizer(language)
+
+
+def get_punkt_tokenizer(language="english"):
+    """Return the process-wide Punkt sentence tokenizer for `language`, loading it once."""
+    tokenizer = _tokenizers.get(language)
+    if tokenizer is None:
+        with _tokenizer_lock:
+            tokenizer = _tokenizers.get(language)
+            if tokenizer is None:
+                tokenizer = _tokenizers[language] = _load_punkt(language)
+    return tokenizer
+
+
+def sentence_spans(text, language="english"):
+    """
+    (start, end) character offsets of every sentence in `text`, memoized per text hash.
+    `[text[s:e] for s, e in sentence_spans(text)]` equals `nltk.sent_tokenize(text)`.
+    """
+    key = (language, hashlib.sha1(text.encode("utf-8")).hexdigest())
+    spans = _span_cache.get(key)
+    if spans is None:
+        spans = tuple(get_punkt_tokenizer(language).span_tokenize(text))
+        _span_cache.put(key, spans)
+    return spans
+
+
+def split_sentences(text, language="english"):
+    """Drop-in replacement for `sent_tokenize` backed by the shared segmentation pass."""
+    return [text[start:end] for start, end in sentence_spans(text, language)]
+
+
+def count_sentences(text, language="english"):
+    return len(sentence_spans(text, language))
+
+
+def segmentation_stats():
+    """Hit/miss counters of the span memo."""
+    return _span_cache.stats()
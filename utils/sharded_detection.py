@@ -0,0 +1,76 @@
+# utils/sharded_detection.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from utils.detector_engine import BatchedDetector, DEFAULT_MAX_BATCH_TOKENS
+
+# Shards handed out per worker; a few per worker keeps the pool busy when
+# shards finish unevenly, while each shard stays contiguous.
+SHARDS_PER_WORKER = 4
+MIN_SHARD_SIZE = 16
+
+_worker_detector = None
+
+
+def _init_worker(backend, max_batch_tokens, torch_threads):
+    """Pool initializer: pin torch threads and load the detector once per process."""
+    global _worker_detector
+    import torch
+    from utils.model_loaders import build_detector_pipeline
+
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+    _worker_detector = BatchedDetector(build_detector_pipeline(backend), max_batch_tokens=max_batch_tokens)
+
+
+def _score_shard(sentences):
+    return _worker_detector(sentences)
+
+
+def default_torch_threads(workers):
+    """Split the available cores evenly between workers."""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def split_shards(items, workers, shards_per_worker=SHARDS_PER_WORKER, min_size=MIN_SHARD_SIZE):
+    """Cut `items` into contiguous, near-equal shards."""
+    if not items:
+        return []
+    count = max(1, min(workers * shards_per_worker, len(items) // min_size))
+    size, extra = divmod(len(items), count)
+    shards = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(items[start:end])
+        start = end
+    return shards
+
+
+class ShardedDetector:
+    """
+    Process-pool detector. Each worker loads the detector once; sentences are
+    split into contiguous shards and results are merged back in order, so an
+    instance can be used anywhere a BatchedDetector is.
+    """
+
+    def __init__(self, workers, torch_threads=None, max_batch_tokens=DEFAULT_MAX_BATCH_TOKENS,
+                 backend="torch"):
+        self.workers = workers
+        self.torch_threads = torch_threads or default_torch_threads(workers)
+        # "spawn" avoids inheriting a parent that already initialised torch's thread pools.
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(backend, max_batch_tokens, self.torch_threads),
+        )
+
+    def __call__(self, sentences):
+        results = []
+        for shard_results in self._pool.map(_score_shard, split_shards(list(sentences), self.workers)):
+            results.extend(shard_results)
+        return results
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
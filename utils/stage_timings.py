@@ -0,0 +1,112 @@
+# utils/stage_timings.py
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# tracemalloc is process-wide: it is started by the first request that asks
+# for allocation tracking and stopped when the last one finishes.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            # Leave tracing alone if something else had already started it.
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class StageTimings:
+    """
+    Wall time and memory allocations per pipeline stage, for one request.
+
+    Use as a context manager around the request; each stage is wrapped in
+    measure(name). With `track_memory`, tracemalloc runs for the duration of
+    the block (it slows every allocation down, so only when asked) and each
+    stage records the bytes it left allocated and its peak above the starting
+    point. Allocations of other threads running at the same time are counted
+    too, since tracemalloc cannot tell requests apart.
+    """
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.stages = {}
+        self._tracing = False
+
+    def __enter__(self):
+        if self.track_memory:
+            _start_tracing()
+            self._tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._tracing:
+            self._tracing = False
+            _stop_tracing()
+        return False
+
+    @contextmanager
+    def measure(self, name):
+        """Time the block (and its allocations when tracing) as one call of stage `name`."""
+        if self._tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = peak = None
+            if self._tracing:
+                current, highest = tracemalloc.get_traced_memory()
+                allocated = current - before
+                peak = highest - before
+            self.record(name, elapsed * 1000, allocated, peak)
+
+    def record(self, name, ms, allocated=None, peak=None, calls=1):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {"calls": 0, "ms": 0.0}
+            if allocated is not None:
+                stage["allocated_bytes"] = 0
+                stage["peak_bytes"] = 0
+        stage["calls"] += calls
+        stage["ms"] += ms
+        if allocated is not None and "allocated_bytes" in stage:
+            stage["allocated_bytes"] += allocated
+            stage["peak_bytes"] = max(stage["peak_bytes"], peak)
+
+    def merge(self, stages):
+        """Add per-stage results from another StageTimings.as_dict() (e.g. a worker process)."""
+        for name, stage in stages.items():
+            self.record(name, stage["ms"], stage.get("allocated_bytes"), stage.get("peak_bytes"),
+                        calls=stage["calls"])
+
+    def as_dict(self):
+        """{stage: {"calls", "ms"[, "allocated_bytes", "peak_bytes"]}} in the order stages first ran."""
+        return {name: dict(stage, ms=round(stage["ms"], 3)) for name, stage in self.stages.items()}
+
+    def __repr__(self):
+        parts = ", ".join(f"{name}={stage['ms']:.1f}ms" for name, stage in self.stages.items())
+        return f"StageTimings({parts})"
+
+
+def measure(timings, name):
+    """timings.measure(name), or a no-op block when `timings` is None."""
+    if timings is None:
+        return nullcontext()
+    return timings.measure(name)
@@ -0,0 +1,196 @@
+# utils/synonym_index.py
+"""
+Precomputed WordNet synonym index stored in a memory-mappable file.
+
+Build it once offline (needs the NLTK WordNet corpus):
+
+    python -m utils.synonym_index build [path]
+
+At runtime `SynonymIndex` answers (word, POS) -> synonyms with binary searches
+over the mapped file and never touches the WordNet corpus reader. The file is
+opened read-only with mmap, so worker processes share the same pages.
+
+File layout (little-endian):
+    magic (8 bytes) | n_keys, keys_len, values_len (3 x uint32)
+    key offsets (n_keys + 1 x uint32) | value offsets (n_keys + 1 x uint32)
+    keys blob | values blob
+Keys are sorted byte strings:
+    b"L" + pos + b"\\0" + form  -> lemma names of the synsets indexed under form
+    b"E" + pos + b"\\0" + form  -> base forms from WordNet's exception lists
+Values are "\\n"-joined UTF-8 strings.
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+
+MAGIC = b"WNSYN1\0\0"
+HEADER = struct.Struct("<8sIII")
+OFFSET = struct.Struct("<I")
+DEFAULT_INDEX_PATH = os.environ.get(
+    "SYNONYM_INDEX_PATH", os.path.join(".cache", "wordnet_synonyms.idx")
+)
+
+# Mirrors nltk's WordNetCorpusReader.MORPHOLOGICAL_SUBSTITUTIONS.
+MORPHOLOGICAL_SUBSTITUTIONS = {
+    "n": [("s", ""), ("ses", "s"), ("ves", "f"), ("xes", "x"), ("zes", "z"),
+          ("ches", "ch"), ("shes", "sh"), ("men", "man"), ("ies", "y")],
+    "v": [("s", ""), ("ies", "y"), ("es", "e"), ("es", ""), ("ed", "e"),
+          ("ed", ""), ("ing", "e"), ("ing", "")],
+    "a": [("er", ""), ("est", ""), ("er", "e"), ("est", "e")],
+    "r": [],
+}
+POS_LIST = ("n", "v", "a", "r")
+
+
+def _key(kind, pos, form):
+    return kind + pos.encode("ascii") + b"\0" + form.encode("utf-8")
+
+
+class SynonymIndex:
+    """Read-only, memory-mapped (lemma, POS) -> synonym lookup."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_keys, keys_len, values_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a synonym index")
+        self._key_offsets = HEADER.size
+        self._value_offsets = self._key_offsets + OFFSET.size * (self.n_keys + 1)
+        self._keys = self._value_offsets + OFFSET.size * (self.n_keys + 1)
+        self._values = self._keys + keys_len
+
+    def _offset(self, table, idx):
+        return OFFSET.unpack_from(self._mm, table + OFFSET.size * idx)[0]
+
+    def _key_at(self, idx):
+        start = self._keys + self._offset(self._key_offsets, idx)
+        end = self._keys + self._offset(self._key_offsets, idx + 1)
+        return self._mm[start:end]
+
+    def _lookup(self, key):
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.n_keys or self._key_at(lo) != key:
+            return None
+        start = self._values + self._offset(self._value_offsets, lo)
+        end = self._values + self._offset(self._value_offsets, lo + 1)
+        return self._mm[start:end].decode("utf-8").split("\n")
+
+    def morphy(self, form, pos):
+        """Base forms of `form` present in WordNet for `pos`, as nltk's _morphy returns them."""
+        forms = self._lookup(_key(b"E", pos, form))
+        if forms is None:
+            forms = [form[:-len(old)] + new for old, new in MORPHOLOGICAL_SUBSTITUTIONS[pos]
+                     if form.endswith(old)]
+        result = []
+        for candidate in [form] + forms:
+            if candidate not in result and self._lookup(_key(b"L", pos, candidate)) is not None:
+                result.append(candidate)
+        return result
+
+    def lemma_names(self, word, pos):
+        """Lemma names of every synset `wordnet.synsets(word, pos)` would return."""
+        names = []
+        for form in self.morphy(word.lower(), pos):
+            names.extend(self._lookup(_key(b"L", pos, form)))
+        return names
+
+    def known(self, word):
+        """Equivalent of `bool(wordnet.synsets(word))`."""
+        word = word.lower()
+        return any(self.morphy(word, pos) for pos in POS_LIST)
+
+    def synonyms(self, word, pos):
+        """Distinct lemma names for (word, pos), excluding the word itself."""
+        lowered = word.lower()
+        seen = set()
+        result = []
+        for name in self.lemma_names(word, pos):
+            if name.lower() != lowered and name not in seen:
+                seen.add(name)
+                result.append(name)
+        return result
+
+
+# path -> SynonymIndex, or _NOT_BUILT when the file was missing at first lookup.
+_indexes = {}
+_index_lock = threading.Lock()
+_NOT_BUILT = object()
+
+
+def load_synonym_index(path=DEFAULT_INDEX_PATH):
+    """
+    Open the shared index once per process; None when it has not been built.
+    The result, including "not built", is remembered, so the per-token calls
+    from the humanizer are a dict lookup without locking or touching the disk.
+    """
+    index = _indexes.get(path)
+    if index is None:
+        with _index_lock:
+            index = _indexes.get(path)
+            if index is None:
+                index = SynonymIndex(path) if os.path.exists(path) else _NOT_BUILT
+                _indexes[path] = index
+    return None if index is _NOT_BUILT else index
+
+
+def build_synonym_index(path=DEFAULT_INDEX_PATH):
+    """Generate the index file from the NLTK WordNet corpus. Returns the number of keys."""
+    from nltk.corpus import wordnet
+
+    entries = {}
+    for pos in POS_LIST:
+        for form in wordnet.all_lemma_names(pos=pos):
+            offsets = wordnet._lemma_pos_offset_map[form].get(pos, [])
+            names = []
+            for offset in offsets:
+                for lemma in wordnet.synset_from_pos_and_offset(pos, offset).lemmas():
+                    name = lemma.name().replace("_", " ")
+                    if name not in names:
+                        names.append(name)
+            entries[_key(b"L", pos, form)] = names
+        for form, bases in wordnet._exception_map[pos].items():
+            entries[_key(b"E", pos, form)] = list(bases)
+
+    keys = sorted(entries)
+    key_blob = bytearray()
+    value_blob = bytearray()
+    key_offsets = [0]
+    value_offsets = [0]
+    for key in keys:
+        key_blob += key
+        key_offsets.append(len(key_blob))
+        value_blob += "\n".join(entries[key]).encode("utf-8")
+        value_offsets.append(len(value_blob))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, len(keys), len(key_blob), len(value_blob)))
+        handle.write(struct.pack(f"<{len(key_offsets)}I", *key_offsets))
+        handle.write(struct.pack(f"<{len(value_offsets)}I", *value_offsets))
+        handle.write(key_blob)
+        handle.write(value_blob)
+    os.replace(tmp_path, path)
+    with _index_lock:
+        # Let the next load_synonym_index(path) in this process open the new file.
+        _indexes.pop(path, None)
+    return len(keys)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        sys.exit("usage: python -m utils.synonym_index build [path]")
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_INDEX_PATH
+    print(f"Wrote {build_synonym_index(target)} keys to {target}")
@@ -0,0 +1,249 @@
+# utils/token_document.py
+import bisect
+import re
+from utils.citations import find_citations
+from utils.contractions import EXPANDER
+from utils.segmentation import sentence_spans
+from utils.stage_timings import measure
+
+# Used to split editable text into tokens when no spaCy pipeline is available.
+_PLAIN_TOKEN_REGEX = re.compile(r"\S+")
+
+
+class TokenDocument:
+    """
+    A paragraph parsed once into parallel token arrays that every humanizer
+    stage edits in place:
+
+    - `words`: token text (stages replace entries, e.g. with synonyms)
+    - `offsets`: character offset of the token in the source paragraph
+    - `pos`: coarse spaCy POS, or None for citations and untagged tokens
+    - `spaces`: whitespace that followed the token (" " or "")
+    - `protected`: True for citations, which are single tokens no stage touches
+
+    `sentence_starts` holds the token index each sentence begins at and
+    `prefixes` an optional text per sentence (e.g. a transition). render()
+    builds the output string once at the end.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.words = []
+        self.offsets = []
+        self.pos = []
+        self.spaces = []
+        self.protected = []
+        self.sentence_starts = []
+        self.prefixes = []
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word, offset, pos, space, protected=False):
+        self.words.append(word)
+        self.offsets.append(offset)
+        self.pos.append(pos)
+        self.spaces.append(space)
+        self.protected.append(protected)
+
+    def start_sentence(self):
+        self.sentence_starts.append(len(self.words))
+        self.prefixes.append(None)
+
+    def sentences(self):
+        """(start, end) token ranges, one per sentence."""
+        bounds = self.sentence_starts + [len(self.words)]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def render(self):
+        """Join the tokens with their whitespace; sentences are separated by one space."""
+        parts = []
+        for prefix, (start, end) in zip(self.prefixes, self.sentences()):
+            if start == end:
+                continue
+            if parts:
+                parts.append(" ")
+            if prefix:
+                parts.append(prefix)
+                parts.append(" ")
+            for i in range(start, end - 1):
+                parts.append(self.words[i])
+                parts.append(self.spaces[i])
+            parts.append(self.words[end - 1])
+        return "".join(parts)
+
+
+def _merge_spans(spans, citations):
+    """
+    Merge sentence spans whose boundary falls inside one of the (start, end, style)
+    citations, so a sentence never ends after e.g. the "et al." of a citation.
+    """
+    if not citations:
+        return list(spans)
+    merged = []
+    c = 0
+    for start, end in spans:
+        while c < len(citations) and citations[c][1] <= start:
+            c += 1
+        if merged and c < len(citations) and citations[c][0] < start:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _source_offset(x, base, edits):
+    """Map offset `x` in an expanded piece back to the source, given its contraction edits."""
+    shift = 0
+    for start, end, repl in edits:
+        expanded_start = start + shift
+        if x < expanded_start:
+            break
+        if x < expanded_start + len(repl):
+            return base + start
+        shift += len(repl) - (end - start)
+    return base + x - shift
+
+
+def _split_citations(spans, citations=()):
+    """
+    Per sentence, its (start, end, is_citation) pieces in order. `citations`
+    are the text's (start, end, style) citations; only those that lie
+    inside a sentence are protected.
+    """
+    sentences = []
+    c = 0
+    for sent_start, sent_end in spans:
+        pieces = []
+        last = sent_start
+        while c < len(citations) and citations[c][0] < sent_start:
+            c += 1
+        while c < len(citations) and citations[c][1] <= sent_end:
+            start, end, _ = citations[c]
+            pieces.append((last, start, False))
+            pieces.append((start, end, True))
+            last = end
+            c += 1
+        pieces.append((last, sent_end, False))
+        sentences.append(pieces)
+    return sentences
+
+
+def _expand_pieces(text, sentences, expander):
+    """
+    Turn the pieces of each sentence into ("edit", source_start, expanded, edits, space)
+    and ("cite", source_start, citation, space) items. Editable pieces are
+    stripped and have their contractions expanded (unless `expander` is None);
+    `space` is the whitespace kept after the piece (" " or "").
+    """
+    plan = []
+    for pieces in sentences:
+        items = []
+        for start, end, is_citation in pieces:
+            if is_citation:
+                items.append(("cite", start, text[start:end], " " if text[end:end + 1].isspace() else ""))
+                continue
+            piece = text[start:end]
+            stripped = piece.strip()
+            if not stripped:
+                continue
+            lead = len(piece) - len(piece.lstrip())
+            edits = list(expander.edits(stripped)) if expander is not None else []
+            expanded = expander.expand(stripped) if edits else stripped
+            space = " " if len(piece) > lead + len(stripped) else ""
+            items.append(("edit", start + lead, expanded, edits, space))
+        plan.append(items)
+    return plan
+
+
+def _editable_text(plan):
+    """Join a paragraph's editable pieces with single spaces; returns (text, start offset per edit item)."""
+    chunks = []
+    starts = {}
+    length = 0
+    for s, items in enumerate(plan):
+        for k, item in enumerate(items):
+            if item[0] != "edit":
+                continue
+            if chunks:
+                chunks.append(" ")
+                length += 1
+            starts[s, k] = length
+            chunks.append(item[2])
+            length += len(item[2])
+    return "".join(chunks), starts
+
+
+def _tokens(editable, doc):
+    """(text, idx, pos, whitespace) per token, from a spaCy doc or plain whitespace splitting."""
+    if doc is None:
+        return [(m.group(0), m.start(), None, " " if editable[m.end():m.end() + 1].isspace() else "")
+                for m in _PLAIN_TOKEN_REGEX.finditer(editable)]
+    return [(t.text, t.idx, t.pos_, t.whitespace_) for t in doc]
+
+
+def build_documents(texts, nlp=None, spans=None, batch_size=256, n_process=1,
+                    expander=EXPANDER, protect_citations=True, timings=None):
+    """
+    Build one TokenDocument per text. Sentences come from the shared
+    segmentation, never split inside a citation, unless `spans` gives them
+    per text. Contractions are expanded in the editable pieces (unless
+    `expander` is None), citations become single protected tokens (unless
+    `protect_citations` is False), and all texts' editable parts are parsed
+    together in one nlp.pipe pass (or split on whitespace when `nlp` is
+    None). Disabled passes do not run at all. Each phase that runs is timed
+    into `timings`, a StageTimings, when given.
+    """
+    given_spans = spans is not None
+    if not given_spans:
+        with measure(timings, "segment"):
+            spans = [sentence_spans(text) for text in texts]
+    if protect_citations:
+        with measure(timings, "citations"):
+            citations = [list(find_citations(text)) for text in texts]
+            if not given_spans:
+                spans = [_merge_spans(text_spans, found) for text_spans, found in zip(spans, citations)]
+            sentences = [_split_citations(text_spans, found) for text_spans, found in zip(spans, citations)]
+    else:
+        sentences = [_split_citations(text_spans) for text_spans in spans]
+    if expander is not None:
+        with measure(timings, "contractions"):
+            plans = [_expand_pieces(text, pieces, expander) for text, pieces in zip(texts, sentences)]
+
+    with measure(timings, "parse"):
+        if expander is None:
+            plans = [_expand_pieces(text, pieces, None) for text, pieces in zip(texts, sentences)]
+        layouts = [_editable_text(plan) for plan in plans]
+        editables = [editable for editable, _ in layouts]
+        if nlp:
+            docs = nlp.pipe(editables, batch_size=batch_size, n_process=n_process)
+        else:
+            docs = [None] * len(editables)
+
+        documents = []
+        for text, plan, (editable, edit_starts), doc in zip(texts, plans, layouts, docs):
+            tokens = _tokens(editable, doc)
+            starts = [token[1] for token in tokens]
+            document = TokenDocument(text)
+            for s, items in enumerate(plan):
+                document.start_sentence()
+                for k, item in enumerate(items):
+                    if item[0] == "cite":
+                        _, offset, citation, space = item
+                        document.add(citation, offset, None, space, protected=True)
+                        continue
+                    _, base, expanded, edits, space = item
+                    edit_start = edit_starts[s, k]
+                    first = bisect.bisect_left(starts, edit_start)
+                    last = bisect.bisect_left(starts, edit_start + len(expanded))
+                    for word, idx, pos, whitespace in tokens[first:last]:
+                        if word.isspace():
+                            # Extra whitespace inside a piece becomes a single space.
+                            document.spaces[-1] = " "
+                            continue
+                        document.add(word, _source_offset(idx - edit_start, base, edits), pos,
+                                     " " if whitespace else "")
+                    # The piece's last token keeps the source whitespace before what follows.
+                    document.spaces[-1] = space
+            documents.append(document)
+    return documents
@@ -0,0 +1,97 @@
+# utils/warmup.py
+import logging
+import os
+import sys
+import time
+
+# Comma-separated model names (see MODEL_WARMERS) to load and warm up at startup.
+PRELOAD_MODELS = [name.strip() for name in os.environ.get("PRELOAD_MODELS", "").split(",") if name.strip()]
+
+WARMUP_SENTENCES = [
+    "This is a short warm-up sentence.",
+    "The committee will reconvene next week to review the proposed budget and its long-term implications.",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _load_detector():
+    # Imported lazily so callers that never preload the detector don't pay for transformers.
+    from utils.model_loaders import load_detector_engine
+    return load_detector_engine()
+
+
+def _load_paraphraser():
+    from utils.model_loaders import load_paraphrase_model
+    return load_paraphrase_model()
+
+
+def _warm_detector(engine):
+    engine(WARMUP_SENTENCES)
+
+
+def _warm_paraphraser(paraphraser):
+    paraphraser("Rewrite: " + WARMUP_SENTENCES[0], max_new_tokens=8)
+
+
+# name -> (loader, warm-up call run once on the loaded model)
+MODEL_WARMERS = {
+    "detector": (_load_detector, _warm_detector),
+    "paraphrase": (_load_paraphraser, _warm_paraphraser),
+}
+
+
+def _peak_rss_mb():
+    # `resource` only exists on POSIX; report 0.0 where it is missing (Windows).
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux but bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def resident_memory_mb():
+    """
+    Current resident set size of this process in MB (peak RSS where /proc is
+    unavailable, 0.0 where neither is, e.g. on Windows).
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def preload_models(names=None, warmers=None):
+    """
+    Load and warm up the named models (default: PRELOAD_MODELS), logging per-model load
+    time, warm-up time and resident memory. `warmers` adds or overrides entries of
+    MODEL_WARMERS. Returns the per-model report.
+    """
+    registry = dict(MODEL_WARMERS, **(warmers or {}))
+    report = {}
+    for name in (PRELOAD_MODELS if names is None else names):
+        if name not in registry:
+            raise ValueError(f"Unknown model {name!r}; expected one of {sorted(registry)}")
+        load, warm = registry[name]
+        rss_before = resident_memory_mb()
+        start = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        warm(model)
+        warmed = time.perf_counter()
+        rss_after = resident_memory_mb()
+        report[name] = {
+            "load_seconds": round(loaded - start, 3),
+            "warmup_seconds": round(warmed - loaded, 3),
+            "rss_mb": round(rss_after, 1),
+            "rss_delta_mb": round(rss_after - rss_before, 1),
+        }
+        logger.info("Loaded %s in %.2fs (warm-up %.2fs); RSS %.1f MB (+%.1f MB)", name,
+                    loaded - start, warmed - loaded, rss_after, rss_after - rss_before)
+    return report